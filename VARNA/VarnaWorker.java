@@ -0,0 +1,55 @@
+import java.io.BufferedReader;
+import java.io.InputStreamReader;
+import java.io.PrintStream;
+import java.util.Vector;
+
+import fr.orsay.lri.varna.applications.VARNAcmd;
+
+/**
+ * Rendering worker of rna_prediction.py (VarnaWorker): one JVM with VARNA loaded that draws
+ * the structures read from its standard input, one job per line:
+ *
+ *     sequence TAB structure TAB title TAB output file
+ *
+ * Each job is drawn with VARNAcmd like
+ * 'VARNAcmd -sequenceDBN sequence -structureDBN structure -title title -o output file'
+ * and answered with a line 'OK' or 'ERROR message'. The messages of VARNA go to the standard
+ * error. It is run as a source file, so java 11 or newer is needed:
+ *
+ *     java -cp VARNA/VARNAv3-93.jar VARNA/VarnaWorker.java
+ */
+public class VarnaWorker {
+    public static void main(String[] args) throws Exception {
+        BufferedReader jobs = new BufferedReader(new InputStreamReader(System.in, "UTF-8"));
+        PrintStream answers = System.out;
+        System.setOut(System.err);
+        answers.println("READY");
+        answers.flush();
+
+        String line;
+        while ((line = jobs.readLine()) != null) {
+            String[] job = line.split("\t", -1);
+            String answer = "OK";
+            if (job.length != 4) {
+                answer = "ERROR invalid job: " + line;
+            } else {
+                Vector<String> options = new Vector<String>();
+                options.add("-sequenceDBN");
+                options.add(job[0]);
+                options.add("-structureDBN");
+                options.add(job[1]);
+                options.add("-title");
+                options.add(job[2]);
+                options.add("-o");
+                options.add(job[3]);
+                try {
+                    new VARNAcmd(options).run();
+                } catch (Exception e) {
+                    answer = "ERROR " + String.valueOf(e.getMessage()).replace('\n', ' ');
+                }
+            }
+            answers.println(answer);
+            answers.flush();
+        }
+    }
+}
@@ -0,0 +1,106 @@
+import sys
+import time
+import random
+import argparse
+
+import rna_dp
+from rna_prediction import Predictor, BASES, BENCH_EXAMPLES, energy_name, candidate_pairings, pairing_counts
+
+'''
+Regression check of the optimum of the encodings and of the dynamic programming backend of
+rna_prediction.py, since the repository has no tests. Every sequence of a small fixed corpus
+(the example sequences of up to 14 bases and seeded random sequences) is predicted with each
+energy function and pairing constraints (min_loop, max_span) with the original base encoding
+of clingo, the reference, and with the other encodings and the dp backend: their optimization
+value must be the one of the reference (the encodings have the same answer sets and the dp
+backend computes the same optimum). The structure of the dp backend is also checked: its
+pairings are candidate pairings without pseudo-knots and their energy is its optimization value.
+The predictions of clingo stopped by the time limit are not compared.
+
+    python check_predictions.py [--lengths 8,12,16] [--sequences 3] [--time-limit 20]
+
+It exits with code 1 if some prediction differs.
+'''
+
+# Encodings compared with the base encoding (ENCODINGS of rna_prediction.py)
+CHECK_ENCODINGS = ['nested', 'canpair', 'half']
+# Pairing constraints (min_loop, max_span) of the predictions (None: no limit)
+CHECK_CONSTRAINTS = [(1, None), (3, None), (1, 6), (3, 10)]
+CHECK_LENGTHS = [8, 12, 16]
+CHECK_SEQUENCES = 3
+CHECK_SEED = 23
+CHECK_TIME_LIMIT = 20
+
+
+def main():
+    '''
+    Check command: compares the predictions of the corpus and prints the ones that differ.
+    '''
+    parser = argparse.ArgumentParser(description='Regression check of the optimum of the encodings and of the dp backend.')
+    parser.add_argument('--lengths', type=str, default=','.join(str(length) for length in CHECK_LENGTHS),
+                        help='lengths of the random sequences separated by commas [default: {}]'.format(','.join(str(length) for length in CHECK_LENGTHS)))
+    parser.add_argument('--sequences', type=int, default=CHECK_SEQUENCES,
+                        help='random sequences of each length [default: {}]'.format(CHECK_SEQUENCES))
+    parser.add_argument('--energies', type=str, default='1,2,0',
+                        help='energy functions separated by commas [default: 1,2,0]')
+    parser.add_argument('--time-limit', type=int, default=CHECK_TIME_LIMIT,
+                        help='time limit of each clingo prediction in seconds [default: {}]'.format(CHECK_TIME_LIMIT))
+    args = parser.parse_args()
+    lengths = [int(length) for length in args.lengths.split(',')]
+    energies = [int(energy) for energy in args.energies.split(',')]
+
+    generator = random.Random(CHECK_SEED)
+    corpus = [sequence for sequence in BENCH_EXAMPLES if len(sequence) <= 14]
+    corpus += [''.join(generator.choice(BASES) for _ in range(length)) for length in lengths for _ in range(args.sequences)]
+
+    checked, skipped, failures = 0, 0, []
+    start = time.perf_counter()
+    for min_loop, max_span in CHECK_CONSTRAINTS:
+        options = dict(verbose=False, min_loop=min_loop, max_span=max_span, time_limit=args.time_limit)
+        reference = Predictor(encoding='base', **options)
+        predictors = {encoding: Predictor(encoding=encoding, **options) for encoding in CHECK_ENCODINGS}
+        predictors['dp'] = Predictor(backend='dp', **options)
+        for sequence in corpus:
+            for energy in energies:
+                expected = reference.predict(sequence, energy)
+                for name, predictor in predictors.items():
+                    prediction = predictor.predict(sequence, energy)
+                    if name == 'dp':
+                        error = dp_error(prediction, min_loop, max_span, predictor.c1_grid)
+                        if error is not None: failures.append((sequence, energy, min_loop, max_span, name, error))
+                    if not (expected.optimal and prediction.optimal):
+                        skipped += 1
+                        continue
+                    checked += 1
+                    if prediction.optimization != expected.optimization:
+                        failures.append((sequence, energy, min_loop, max_span, name,
+                                         'optimization {} instead of {}'.format(prediction.optimization, expected.optimization)))
+
+    print('{} PREDICTIONS COMPARED, {} NOT COMPARED (TIME LIMIT), {} FAILURES IN {:.1f}s'.format(
+          checked, skipped, len(failures), time.perf_counter()-start))
+    for sequence, energy, min_loop, max_span, name, error in failures:
+        print('{} E{} min_loop={} max_span={} {}: {}'.format(sequence, energy_name(energy), min_loop, max_span, name, error))
+    if failures: sys.exit(1)
+
+def dp_error(prediction, min_loop, max_span, c1_grid):
+    '''
+    Returns the error of the structure of a prediction of the dp backend, None if its pairings
+    are candidate pairings (candidate_pairings), each base is paired once at most, there are no
+    pseudo-knots and their energy is the optimization value of the prediction.
+    '''
+    sequence, pairings = prediction.sequence, prediction.pairings
+    candidates = set(candidate_pairings(sequence, min_loop, max_span))
+    if any((i, j) not in candidates for i, j in pairings.items()): return 'pairing not in the candidate pairings'
+    if len(set(pairings) | set(pairings.values())) != 2*len(pairings): return 'base paired twice'
+    if any(i < k < j < l for i, j in pairings.items() for k, l in pairings.items()): return 'pseudo-knot'
+    n = len(sequence)
+    au, cg = pairing_counts(sequence, pairings)
+    if prediction.energy == 1: energy = -2*len(pairings)
+    elif prediction.energy == 2: energy = rna_dp.energy2(n, len(pairings), au, cg, c1_grid)[0]
+    else: energy = -rna_dp.energy2_0(n, len(pairings), au, cg)
+    if energy != prediction.optimization: return 'energy of the structure {} instead of {}'.format(energy, prediction.optimization)
+    return None
+
+
+if __name__ == '__main__':
+    main()
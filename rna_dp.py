@@ -0,0 +1,225 @@
+import numpy as np
+
+'''
+Dynamic programming solvers of the energy functions used in rna_prediction.py.
+They compute the same optimum as the clingo programs for the base encodings
+(pseudo-knot free pairings chosen among the candidate pairings computed by
+candidate_pairings in rna_prediction.py) without an ASP optimization.
+
+    - nussinov: maximum number of pairings (energy 1, rna_ss_prediction_E1.lp)
+      in O(n^3) with an anti-diagonal vectorised fill plus traceback.
+    - count_dp: energies that only depend on the length of the sequence and the
+      number of pairings, AU pairings and CG pairings (energy 2 and energy 0,
+      rna_ss_prediction_E2.lp and rna_ss_prediction_E2_0.lp). It records which
+      counts of pairings of each type are achievable and evaluates the energy in
+      closed form for each of them.
+
+Pairings are returned as a dictionary {i: j} of 1-based sequence indexes, i < j,
+like the pairing dictionary built by read_clingo_output in rna_prediction.py.
+'''
+
+def pairing_matrix(n, candidates):
+    '''
+    Boolean matrix P of shape (n,n) where P[i,j] (0-based) is True if (i+1,j+1)
+    is one of the candidate pairings computed by candidate_pairings.
+    '''
+    can_pair = np.zeros((n,n), dtype=bool)
+    for i,j in candidates: can_pair[i-1,j-1] = True
+    return can_pair
+
+
+def nussinov(sequence, candidates):
+    '''
+    Computes a pseudo-knot free structure with the maximum number of pairings
+    of the sequence (Nussinov algorithm).
+
+    The matrix N[i,j] (maximum number of pairings between bases i and j) is filled
+    one anti-diagonal d = j - i at a time, computing all its cells at once:
+
+        N[i,j] = max(N[i+1,j-1] + P[i,j], max_{i<=k<j} N[i,k] + N[k+1,j])
+
+    Returns the pairing dictionary {i: j} (1-based indexes).
+
+    Example: nussinov('ACCGU', [(1,5), (2,4)]) -> {1: 5, 2: 4}
+    '''
+    n = len(sequence)
+    if n == 0: return {}
+    can_pair = pairing_matrix(n, candidates)
+    N = np.zeros((n+1,n+1), dtype=np.int32)     # N[i,j] = 0 if j <= i (extra row for N[k+1,j])
+
+    for d in range(1, n):
+        i = np.arange(n-d)
+        j = i + d
+        # i and j paired (N[i+1,j-1] = 0 if the inner interval is empty)
+        best = np.where(can_pair[i,j], N[i+1,j-1] + 1, 0)
+        # bifurcation: [i,k] and [k+1,j] for k = i..j-1 (includes i or j unpaired)
+        k = i[:,None] + np.arange(d)[None,:]
+        best = np.maximum(best, (N[i[:,None],k] + N[k+1,j[:,None]]).max(axis=1))
+        N[i,j] = best
+
+    return nussinov_traceback(N, can_pair)
+
+
+def nussinov_traceback(N, can_pair):
+    '''
+    Recovers the pairings of an optimal structure from the filled matrix N.
+    '''
+    pairing_dict = {}
+    stack = [(0, N.shape[0]-2)]
+    while stack:
+        i, j = stack.pop()
+        if j <= i or N[i,j] == 0: continue
+        if can_pair[i,j] and N[i,j] == N[i+1,j-1] + 1:
+            pairing_dict[i+1] = j+1
+            stack.append((i+1, j-1))
+            continue
+        for k in range(i, j):
+            if N[i,j] == N[i,k] + N[k+1,j]:
+                stack.append((i, k))
+                stack.append((k+1, j))
+                break
+    return dict(sorted(pairing_dict.items()))
+
+
+# Pairing types of the count dynamic programming: index of the count (AU, CG or GU)
+PAIRING_TYPES = {'AU': 0, 'UA': 0, 'CG': 1, 'GC': 1, 'GU': 2, 'UG': 2}
+# Value of the non achievable counts
+NOT_ACHIEVABLE = -1
+
+
+def count_tables(sequence, candidates):
+    '''
+    Computes the table F of shape (n+1, n+1, A+1, C+1), where A and C are the maximum
+    number of AU and CG pairings of the sequence, such that F[i,j,a,c] is the maximum
+    number of GU pairings of a pseudo-knot free structure of the bases i..j-1 (0-based)
+    with exactly a AU pairings and c CG pairings, or NOT_ACHIEVABLE if there is none.
+    Since any subset of the pairings of a structure is also a structure, every number
+    of GU pairings from 0 to F[i,j,a,c] is achievable too.
+
+    The table is filled one column j at a time (base j-1 unpaired or paired with k),
+    computing all the intervals i..j-1 at once:
+
+        F[i,j] = max(F[i,j-1], max_k F[i,k] (+) shift(F[k+1,j-1], type(k,j-1)))
+
+    where (+) is the (max,+) convolution over the counts (a,c) and shift adds the
+    pairing (k,j-1) to the counts of its type.
+    '''
+    n = len(sequence)
+    A = min(sequence.count('A'), sequence.count('U'))
+    C = min(sequence.count('C'), sequence.count('G'))
+    can_pair = pairing_matrix(n, candidates)
+
+    F = np.full((n+1, n+1, A+1, C+1), NOT_ACHIEVABLE, dtype=np.int16)
+    F[:, :, 0, 0] = np.where(np.tri(n+1, dtype=bool).T, 0, NOT_ACHIEVABLE)   # F[i,j,0,0] = 0 if i <= j
+
+    for j in range(1, n+1):
+        F[:j, j] = F[:j, j-1]                   # base j-1 unpaired
+        for k in np.flatnonzero(can_pair[:, j-1]):
+            inner = paired_counts(F[k+1, j-1], sequence[k]+sequence[j-1])
+            outer = F[:k+1, k]                  # intervals i..k-1 for i = 0..k
+            F[:k+1, j] = np.maximum(F[:k+1, j], convolve_counts(outer, inner))
+    return F
+
+
+def paired_counts(counts, pairing):
+    '''
+    Counts table (a,c) -> max GU pairings of a structure after adding a pairing of the
+    given type ('AU', 'CG', 'GU', ...) to the structures of counts.
+    '''
+    shifted = np.full(counts.shape, NOT_ACHIEVABLE, dtype=counts.dtype)
+    pairing_type = PAIRING_TYPES[pairing]
+    if pairing_type == 0: shifted[1:, :] = counts[:-1, :]
+    elif pairing_type == 1: shifted[:, 1:] = counts[:, :-1]
+    else: shifted = np.where(counts >= 0, counts + 1, NOT_ACHIEVABLE)
+    return shifted
+
+
+def convolve_counts(outer, inner):
+    '''
+    (max,+) convolution of a stack of counts tables outer (shape (m, A+1, C+1)) with the
+    counts table inner (shape (A+1, C+1)): combines the structures of both tables adding
+    their counts.
+    '''
+    result = np.full(outer.shape, NOT_ACHIEVABLE, dtype=outer.dtype)
+    A, C = inner.shape
+    # bounding box of the achievable counts of outer
+    rows, cols = np.nonzero((outer >= 0).any(axis=0))
+    a_max, c_max = rows.max()+1, cols.max()+1
+    for a, c in zip(*np.nonzero(inner >= 0)):
+        a_end, c_end = min(A, a+a_max), min(C, c+c_max)
+        block = outer[:, :a_end-a, :c_end-c]
+        block = np.where(block >= 0, block + inner[a,c], NOT_ACHIEVABLE)
+        np.maximum(result[:, a:a_end, c:c_end], block, out=result[:, a:a_end, c:c_end])
+    return result
+
+
+def count_traceback(F, sequence, candidates, au, cg):
+    '''
+    Recovers the pairings of a structure of the whole sequence with exactly au AU pairings,
+    cg CG pairings and F[0,n,au,cg] GU pairings from the filled table F.
+    '''
+    n = len(sequence)
+    can_pair = pairing_matrix(n, candidates)
+    pairing_dict = {}
+    stack = [(0, n, au, cg)]
+    while stack:
+        i, j, a, c = stack.pop()
+        gu = int(F[i,j,a,c])
+        if j <= i or (a == 0 and c == 0 and gu == 0): continue
+        if F[i,j-1,a,c] == gu:                  # base j-1 unpaired
+            stack.append((i, j-1, a, c))
+            continue
+        for k in map(int, np.flatnonzero(can_pair[i:j-1, j-1]) + i):
+            inner = paired_counts(F[k+1,j-1], sequence[k]+sequence[j-1])
+            split = [(int(a2), int(c2)) for a2, c2 in zip(*np.nonzero(inner[:a+1, :c+1] >= 0))
+                     if F[i,k,a-a2,c-c2] >= 0 and F[i,k,a-a2,c-c2] + inner[a2,c2] == gu]
+            if split:
+                a2, c2 = split[0]
+                pairing_dict[k+1] = j
+                pairing_type = PAIRING_TYPES[sequence[k]+sequence[j-1]]
+                stack.append((i, k, a-a2, c-c2))
+                stack.append((k+1, j-1, a2-(pairing_type == 0), c2-(pairing_type == 1)))
+                break
+    return dict(sorted(pairing_dict.items()))
+
+
+def count_dp(sequence, candidates, energy):
+    '''
+    Computes a pseudo-knot free structure minimizing an energy function that only depends
+    on the counts of pairings: energy(pairings, au, cg) -> value to minimize.
+
+    Returns the pairing dictionary {i: j} (1-based indexes) and the minimum energy.
+    '''
+    n = len(sequence)
+    F = count_tables(sequence, candidates)
+    best = None
+    for au, cg in zip(*np.nonzero(F[0,n] >= 0)):
+        for gu in range(F[0,n,au,cg]+1):
+            value = energy(int(au+cg+gu), int(au), int(cg))
+            if best is None or value < best[0]: best = (value, int(au), int(cg), gu)
+    value, au, cg, gu = best
+
+    pairing_dict = count_traceback(F, sequence, candidates, au, cg)
+    # remove the extra GU pairings (any subset of the pairings is also a structure)
+    extra_gu = [i for i, j in pairing_dict.items() if PAIRING_TYPES[sequence[i-1]+sequence[j-1]] == 2]
+    for i in extra_gu[gu:]: del pairing_dict[i]
+    return pairing_dict, value
+
+
+def energy2(n, pairings, au, cg, c1_grid):
+    '''
+    Energy 2 (rna_ss_prediction_E2.lp) of a structure with the best c1 of the grid, the
+    smallest one in case of a tie like c1_best (R18_4), whatever the order of the grid.
+    Returns the energy and c1.
+    '''
+    contacts = 2*pairings
+    c1 = min(c1_grid, key=lambda c1: (abs(c1*n - 100*contacts), c1))
+    return abs(c1*n - 100*contacts) + abs(100*au - 35*pairings) + abs(100*cg - 53*pairings), c1
+
+
+def energy2_0(n, pairings, au, cg):
+    '''
+    Original energy 2 of the authors (rna_ss_prediction_E2_0.lp), to be maximized.
+    '''
+    contacts = 2*pairings
+    return (n - contacts//2) + abs(100*au - 35*contacts) + abs(100*cg - 53*contacts)
@@ -0,0 +1,231 @@
+import numpy as np
+
+'''
+Pure python renderers of the predicted secondary structures, used instead of VARNA with the
+option --renderer of rna_prediction.py (java is not needed). The structure is the parenthesis
+and dots connection string computed by connection_string in rna_prediction.py.
+
+    - radiate: every loop of the structure is drawn as a regular polygon and every stack
+      as a ladder (the simple layout of ViennaRNA's RNAplot, like the radiate view of VARNA).
+      The turning angle of the backbone at each base is computed loop by loop and the
+      coordinates of the bases are their cumulative sums (NumPy).
+    - arc: the bases are drawn on a line and the pairings as arcs over it.
+
+The images are written as SVG (text, without dependencies) or PNG (matplotlib), depending
+on the extension of the output file.
+'''
+
+# Distance between consecutive bases and radius of the bases (SVG pixels)
+BASE_SPACING = 20
+BASE_RADIUS = 7
+MARGIN = 20
+TITLE_HEIGHT = 30
+TITLE_CHAR_WIDTH = 10       # approximate width of a character of the title
+# Colors of the bases, the backbone and the pairings
+BASE_COLORS = {'A': '#f4a582', 'C': '#92c5de', 'G': '#b8e186', 'U': '#fdb863'}
+BACKBONE_COLOR = '#555555'
+PAIRING_COLOR = '#1f4e9b'
+LAYOUTS = ['radiate', 'arc']
+
+
+def pair_table(structure):
+    '''
+    Pair table of a connection string (ViennaRNA convention): array t of size n+2 where t[i]
+    is the base paired with base i (1-based) or 0 if it is unpaired, t[0] = n and t[n+1] = 0.
+
+    Example: '((.))' -> [5, 5, 4, 0, 2, 1, 0]
+    '''
+    n = len(structure)
+    table = np.zeros(n+2, dtype=int)
+    table[0] = n
+    stack = []
+    for i, c in enumerate(structure, start=1):
+        if c == '(': stack.append(i)
+        elif c == ')':
+            j = stack.pop()
+            table[i], table[j] = j, i
+    return table
+
+
+def loop_angles(table):
+    '''
+    Interior angle of the backbone at every base (angle[i] for base i, 1-based) of the simple
+    layout of ViennaRNA: the bases of each loop (with the pairings closing it) are the vertices
+    of a regular polygon, and the bases of a stack are the sides of a ladder (angle pi).
+    The loops are visited with a stack instead of recursively, since their angles are added.
+    '''
+    n = table[0]
+    angle = np.zeros(n+5)
+    loops = [(0, n+1)]       # bases after the pairing closing the loop (i-1 and j+1 paired)
+    while loops:
+        i, j = loops.pop()
+        vertices = 2         # vertices of the polygon (the closing pairing)
+        remember = []        # pairings (k, l) leaving the loop
+        i_old, j = i-1, j+1
+        while i != j:
+            if table[i] == 0 or i == 0:
+                i += 1
+                vertices += 1
+                continue
+            vertices += 2
+            start_k, start_l = k, l = i, table[i]
+            remember += [k, l]
+            i = l + 1
+            ladder = 0
+            while True:         # go along the stack
+                k, l, ladder = k+1, l-1, ladder+1
+                if table[k] != l: break
+            fill = ladder - 2
+            if ladder >= 2:
+                # loop entries and exits get an additional pi/2
+                angle[[start_k+1+fill, start_l-1-fill, start_k, start_l]] += np.pi/2
+                angle[start_k+1:start_k+fill+1] = np.pi
+                angle[start_l-fill:start_l] = np.pi
+            loops.append((k, l))
+        polygon = np.pi*(vertices-2)/vertices
+        remember.append(j)
+        begin = max(i_old, 0)
+        for v in range(0, len(remember), 2):
+            angle[begin:remember[v]+1] += polygon
+            if v+1 < len(remember): begin = remember[v+1]
+    return angle
+
+
+def radiate_layout(structure):
+    '''
+    Coordinates (n, 2) of the bases of the radiate layout, with distance 1 between consecutive
+    bases: the direction of the backbone turns pi - angle[i+1] after base i (loop_angles).
+    '''
+    n = len(structure)
+    angle = loop_angles(pair_table(structure))
+    alpha = np.concatenate([[0.0], np.cumsum(np.pi - angle[2:n])])[:n-1]
+    x = np.concatenate([[0.0], np.cumsum(np.cos(alpha))])
+    y = np.concatenate([[0.0], np.cumsum(np.sin(alpha))])
+    return np.column_stack([x, y])
+
+
+def arc_layout(structure):
+    '''
+    Coordinates (n, 2) of the bases of the arc diagram: a line with distance 1 between bases.
+    '''
+    n = len(structure)
+    return np.column_stack([np.arange(n, dtype=float), np.zeros(n)])
+
+
+def pairings(structure):
+    '''
+    Array (m, 2) of the pairings (i, j), i < j, of a connection string (0-based indexes).
+    '''
+    table = pair_table(structure)[1:-1]
+    i = np.flatnonzero(table > np.arange(1, len(table)+1))
+    return np.column_stack([i, table[i]-1])
+
+
+def image_geometry(structure, layout, title=''):
+    '''
+    Coordinates of the bases in pixels (y downwards, below the title), pairings and size of
+    the image of the layout ('radiate' or 'arc'). The arc diagram is as high as its widest arc,
+    and the structure is centered if the title is wider.
+    '''
+    pairs = pairings(structure)
+    if layout == 'arc':
+        xy = arc_layout(structure)
+        arcs_height = (pairs[:,1]-pairs[:,0]).max()/2 if len(pairs) else 0
+    else:
+        xy = radiate_layout(structure)
+        xy[:,1] *= -1
+        arcs_height = 0
+    xy = (xy - xy.min(axis=0))*BASE_SPACING + MARGIN + BASE_RADIUS
+    xy[:,1] += TITLE_HEIGHT + arcs_height*BASE_SPACING
+    width, height = xy.max(axis=0) + MARGIN + BASE_RADIUS
+    title_width = TITLE_CHAR_WIDTH*len(title) + 2*MARGIN
+    if title_width > width:
+        xy[:,0] += (title_width - width)/2
+        width = title_width
+    return xy, pairs, width, height
+
+
+def svg(sequence, structure, title='', layout='radiate'):
+    '''
+    Returns the SVG image of the structure of sequence with the layout ('radiate' or 'arc').
+    '''
+    xy, pairs, width, height = image_geometry(structure, layout, title)
+    elements = ['<svg xmlns="http://www.w3.org/2000/svg" width="{:.0f}" height="{:.0f}" font-family="Helvetica, Arial, sans-serif">'.format(width, height),
+                '<rect width="100%" height="100%" fill="white"/>',
+                '<text x="{:.1f}" y="{}" font-size="16" text-anchor="middle">{}</text>'.format(width/2, TITLE_HEIGHT-8, escape(title))]
+    points = ' '.join('{:.1f},{:.1f}'.format(x, y) for x, y in xy)
+    elements.append('<polyline points="{}" fill="none" stroke="{}" stroke-width="1.5"/>'.format(points, BACKBONE_COLOR))
+    for i, j in pairs:
+        (x1, y1), (x2, y2) = xy[i], xy[j]
+        if layout == 'arc':
+            r = (x2-x1)/2
+            elements.append('<path d="M {:.1f} {:.1f} A {:.1f} {:.1f} 0 0 1 {:.1f} {:.1f}" fill="none" stroke="{}" stroke-width="1.5"/>'.format(
+                x1, y1-BASE_RADIUS, r, r, x2, y2-BASE_RADIUS, PAIRING_COLOR))
+        else:
+            elements.append('<line x1="{:.1f}" y1="{:.1f}" x2="{:.1f}" y2="{:.1f}" stroke="{}" stroke-width="2"/>'.format(
+                x1, y1, x2, y2, PAIRING_COLOR))
+    for base, (x, y) in zip(sequence, xy):
+        elements.append('<circle cx="{:.1f}" cy="{:.1f}" r="{}" fill="{}" stroke="{}"/>'.format(
+            x, y, BASE_RADIUS, BASE_COLORS.get(base, 'white'), BACKBONE_COLOR))
+        elements.append('<text x="{:.1f}" y="{:.1f}" font-size="10" text-anchor="middle">{}</text>'.format(x, y+3.5, base))
+    elements.append('</svg>')
+    return '\n'.join(elements) + '\n'
+
+
+def escape(text):
+    '''
+    Escapes the XML special characters of text.
+    '''
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;')
+
+
+def png(sequence, structure, path, title='', layout='radiate', dpi=100):
+    '''
+    Draws the structure of sequence with the layout in the PNG file path with matplotlib,
+    with the same geometry as the SVG image (one pixel per point at the default dpi). Every
+    element is drawn with one collection (the letters with one scatter per base), since an
+    artist per base is the slowest part of matplotlib.
+    '''
+    from matplotlib.figure import Figure
+    from matplotlib.collections import LineCollection
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    xy, pairs, width, height = image_geometry(structure, layout, title)
+    figure = Figure(figsize=(width/dpi, height/dpi), dpi=dpi)
+    FigureCanvasAgg(figure)
+    axes = figure.add_axes([0, 0, 1, 1])
+    axes.set_xlim(0, width)
+    axes.set_ylim(height, 0)
+    axes.axis('off')
+    scale = 72/dpi      # points per pixel
+
+    axes.text(width/2, TITLE_HEIGHT-8, title, fontsize=16*scale, ha='center')
+    axes.plot(xy[:,0], xy[:,1], color=BACKBONE_COLOR, linewidth=1.5*scale, zorder=1)
+    if layout == 'arc':
+        # half circles over the line as polylines (pairings, points, 2)
+        theta = np.linspace(np.pi, 2*np.pi, 33)
+        center = (xy[pairs[:,0]] + xy[pairs[:,1]])/2 - [0, BASE_RADIUS]
+        radius = (xy[pairs[:,1],0] - xy[pairs[:,0],0])/2
+        lines = center[:,None,:] + radius[:,None,None]*np.stack([np.cos(theta), np.sin(theta)], axis=-1)[None]
+        axes.add_collection(LineCollection(lines, colors=PAIRING_COLOR, linewidths=1.5*scale, zorder=2))
+    else:
+        axes.add_collection(LineCollection(xy[pairs], colors=PAIRING_COLOR, linewidths=2*scale, zorder=2))
+    axes.scatter(xy[:,0], xy[:,1], s=(2*BASE_RADIUS*scale)**2, c=[BASE_COLORS.get(base, 'white') for base in sequence],
+                 edgecolors=BACKBONE_COLOR, linewidths=scale, zorder=3)
+    bases = np.array(list(sequence))
+    for base in set(sequence):
+        axes.scatter(xy[bases == base,0], xy[bases == base,1], s=(6.5*scale)**2, marker=r'$\mathrm{{{}}}$'.format(base),
+                     c='black', linewidths=0, zorder=4)
+    figure.savefig(path, format='png', dpi=dpi)
+
+
+def draw(sequence, structure, path, title='', layout='radiate'):
+    '''
+    Draws the structure of sequence with the layout ('radiate' or 'arc') in the image file
+    path, SVG if its extension is .svg and PNG otherwise.
+    '''
+    if path.lower().endswith('.svg'):
+        with open(path, 'w', encoding='utf-8') as image_file:
+            image_file.write(svg(sequence, structure, title, layout))
+    else:
+        png(sequence, structure, path, title, layout)
@@ -1,12 +1,41 @@
 import os
 import re
 import sys
+import csv
+import json
+import math
+import time
+import sqlite3
+import hashlib
+import functools
+import tempfile
+import threading
+import contextlib
+import multiprocessing
 import argparse
+import shutil
+import random
 import platform
 import subprocess
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional
 
 from matplotlib.pyplot import close
 
+try:
+    import resource     # peak memory of the bench command (not available in Windows)
+except ImportError:
+    resource = None
+
+import rna_dp
+import rna_draw
+
+try:
+    import clingo       # clingo python module (optional, used by the api engine)
+    import clingo.ast
+except ImportError:
+    clingo = None
+
 '''
 This program predicts the secondary structure of a RNA sequence
 using CLINGO and maximizing two possible Energy functions. It also generates an image 
@@ -15,16 +44,77 @@ More information about VARNA applet in http://varna.lri.fr/index.php?lang=en&pag
 
 type in console 'python rna_prediction.py --help' to get the following info:
 
-    usage: rna_prediction.py [-h] sequence energy
+    usage: rna_prediction.py [-h] [--metrics [METRICS]] [--timings] [--encoding {base,nested,canpair,half}] [--min-loop MIN_LOOP] [--max-span MAX_SPAN]
+                             [--backend {clingo,dp}] [--engine {api,binary}] [--multishot]
+                             [--multishot-sequences MULTISHOT_SEQUENCES] [--threads THREADS]
+                             [--parallel-mode {compete,split}] [--opt-strategy [ENERGY=]STRATEGY] [--tuning TUNING]
+                             [--no-tuning] [--time-limit TIME_LIMIT] [--log] [--compact] [--c1-grid C1_GRID]
+                             [--renderer {varna,radiate,arc}] [--image-format {png,svg}] [--cache [CACHE]]
+                             [--cache-size CACHE_SIZE] sequence energy
 
     Secondary structure prediction of a RNA sequence with image generation.
 
     positional arguments:
-      sequence    RNA sequence [example: ACCGUA]
-      energy      energy function used [possible values 1, 2]
+      sequence              RNA sequence [example: ACCGUA]
+      energy                energy function used [possible values 1, 2]
 
     optional arguments:
-      -h, --help  show this help message and exit
+      -h, --help            show this help message and exit
+      --metrics [METRICS]   append the timings of the stages of the prediction to a JSON lines file
+                            [default file: stats_output/METRICS.jsonl]
+      --timings             append the timings of the stages of the prediction to the stats file
+      --encoding {base,nested,canpair,half}
+                            base encoding used [default: base]
+      --min-loop MIN_LOOP   minimum number of bases enclosed by a pairing [default: 1]
+      --max-span MAX_SPAN   maximum distance between paired bases [default: no limit]
+      --backend {clingo,dp}
+                            solver used [default: clingo]
+      --engine {api,binary}
+                            how clingo is run [default: api]
+      --multishot           solve the sequences of the api engine in the same clingo control (multi-shot solving)
+      --multishot-sequences MULTISHOT_SEQUENCES
+                            sequences solved in a multi-shot control before it is created again [default: 5]
+      --threads THREADS     number of threads used by clingo [default: 1]
+      --parallel-mode {compete,split}
+                            how the clingo threads solve the problem [default: compete]
+      --opt-strategy [ENERGY=]STRATEGY
+                            optimization strategy of clingo for an energy function (or all of them without energy),
+                            repeatable [default: 1=bb,lin 2=usc,oll 0=bb,lin, example: --opt-strategy 2=bb,dec]
+      --tuning TUNING       file of the clingo profiles found by the autotune command, used if it exists
+                            [default: clingo/tuning.json]
+      --no-tuning           use the default configuration and heuristic of clingo, ignoring the tuning file
+      --time-limit TIME_LIMIT
+                            wall-clock limit of clingo in seconds [default: no limit]
+      --log                 write the clingo output in the clingo output directory
+      --compact             clingo only shows the pairings, contacts and energy of the answers
+      --c1-grid C1_GRID     values of c1 of energy 2 [default: 40,50,60,70,80,100]
+      --renderer {varna,radiate,arc}
+                            how the image is drawn [default: varna]
+      --image-format {png,svg}
+                            format of the image [default: png]
+      --cache [CACHE]       reuse the optimal predictions stored in a SQLite cache file
+      --cache-size CACHE_SIZE
+                            maximum number of predictions of the cache [default: 10000]
+
+The sequences of a FASTA file are predicted with the subcommand batch:
+
+    usage: rna_prediction.py batch [-h] [--output OUTPUT] [--processes PROCESSES] [--images] [--metrics [METRICS]]
+                                   [options above] input energy [energy ...]
+
+The fastest clingo configuration and heuristic for the sequences of a file are written in the tuning file
+with the subcommand autotune:
+
+    usage: rna_prediction.py autotune [-h] [--configurations CONFIGURATIONS] [--heuristics HEURISTICS]
+                                      [--processes PROCESSES] [options above] input energy [energy ...]
+
+The pipeline is measured with a fixed corpus of sequences with the subcommand bench:
+
+    usage: rna_prediction.py bench [-h] [--lengths LENGTHS] [--sequences SEQUENCES] [--energies ENERGIES]
+                                   [--backends BACKENDS] [--output OUTPUT] [options above]
+
+The size of the ground program of a sequence is attributed to the labelled rules of the encodings with the subcommand diagnose:
+
+    usage: rna_prediction.py diagnose [-h] [--output OUTPUT] [options above] sequence energy
 
 Based on 'Exploring Life through Logic Programming: Logic Programming in Bioinformatics -  RNA secondary 
 structure prediction' available in https://computerscience.nmsu.edu/_files/documents/TR-CS-NMSU-2014-10-24.pdf
@@ -39,35 +129,163 @@ CLINGO_SYS_DICT = {'windows':'clingo-5.4.0-win64',
 
 CLINGO_EXE_DIR = os.path.join(CLINGO_DIR,'bin',CLINGO_SYS_DICT[SYSTEM])  # Clingo executable directory
 CLINGO_EXE = os.path.join(CLINGO_EXE_DIR,'clingo')                       # Clingo executable path
+if shutil.which(CLINGO_EXE) is None and shutil.which('clingo') is not None:
+    CLINGO_EXE = shutil.which('clingo')                                   # Clingo installed in the PATH
 
-# Clingo lp file to be executed. The final value is modified using the console parameter 'energy'
+# Clingo lp file to be executed. The final value is given by the console parameter 'energy' (energy_name)
 ENERGY_FILE = 'rna_ss_prediction_E{}.lp'    
 
+# Clingo lp base encodings computing the possible structures. The one used is selected with the console parameter '--encoding'
+ENCODINGS = {'base': 'rna_ss_prediction_base.lp',             # original encoding (quartic no pseudo-knots constraint)
+             'nested': 'rna_ss_prediction_base_nested.lp',    # quadratic no pseudo-knots constraint
+             'canpair': 'rna_ss_prediction_base_canpair.lp',  # pairings restricted to the canpair facts of the input file
+             'half': 'rna_ss_prediction_base_half.lp'}        # canpair encoding without symmetric pairings
+
 CLINGO_OUTPUT_DIR = os.path.join(CLINGO_DIR,'output')                   # Clingo output directory 
-CLINGO_INPUT_DIR =  os.path.join(CLINGO_DIR,'input')                    # Clingo input directory
-CLINGO_INPUT_FILE = os.path.join(CLINGO_INPUT_DIR,'rna_ss_input.lp')    # Clingo program input file (runtime generated)
 
 STATS_DIR = 'stats_output'                                              # Clingo prediction information and stats about the sequence file dirrectory
 
 # original jar from http://varna.lri.fr/index.php?lang=en&page=downloads&css=varna
 VARNA_DIR = 'VARNA'                                             # VARNA file directory
 VARNA_JAR = os.path.join(VARNA_DIR,'VARNAv3-93.jar')            # VARNA jar path
-GENERATED_IMAGES_DIR = 'generated_images'                       # VARNA image generated directory
+VARNA_WORKER = os.path.join(VARNA_DIR,'VarnaWorker.java')       # VARNA rendering worker (VarnaWorker), run as a java 11 source file
+VARNA_CLOSE_TIMEOUT = 10                                        # seconds waited for the JVM of the worker to end before killing it
+JAVA_VERSION = None                                             # version of java ('' if not installed), asked once by is_java_installed
+# How the images are drawn. Selected with the console parameters '--renderer' and '--image-format'
+RENDERERS = ['varna'] + rna_draw.LAYOUTS                        # VARNA (java) or the radiate and arc layouts of rna_draw.py
+RENDERER = 'varna'
+IMAGE_FORMATS = ['png', 'svg']
+IMAGE_FORMAT = 'png'
+GENERATED_IMAGES_DIR = 'generated_images'                       # VARNA (or rna_draw.py) image generated directory
+
+# Solvers of the prediction. The one used is selected with the console parameter '--backend'
+BACKENDS = ['clingo',   # clingo programs (any energy function)
+            'dp']       # dynamic programming solvers of rna_dp.py (any energy function)
+BACKEND = 'clingo'
+
+# How the clingo backend runs the programs. The one used is selected with the console parameter '--engine'
+ENGINES = ['api',       # in process with the clingo python module (if installed, otherwise binary)
+           'binary']    # clingo executable CLINGO_EXE, communicating through its standard input and output
+ENGINE = 'api'
+# Content of the clingo program files already read, without the include of the input file {file name: program}
+PROGRAMS = {}
+# Solvers of the api engine, kept between sequences {(encoding, energy file, min loop, max span): ClingoSolver}
+SOLVERS = {}
+# Solve the sequences of the api engine in the same clingo control (see ClingoSolver). Selected with the console
+# parameter '--multishot'
+MULTISHOT = False
+# Sequences solved in a multi-shot clingo control before it is created again, since the ground program of the
+# released sequences is kept in it. Selected with the console parameter '--multishot-sequences'
+MULTISHOT_SEQUENCES = 5
+# Write the raw clingo output in the clingo output directory. Selected with the console parameter '--log'
+CLINGO_LOG = False
+# Compact answers: only the pairings (i,j) with i<j, the contacts and the energy (constant output of the base
+# encodings). Selected with the console parameter '--compact'
+COMPACT_OUTPUT = False
+# Results of a clingo execution ('Result' of the JSON output)
+CLINGO_RESULTS = ['OPTIMUM FOUND', 'SATISFIABLE', 'UNSATISFIABLE', 'UNKNOWN']
+# Exit codes of a clingo execution that finished: satisfiable, unsatisfiable (search space exhausted) and both (optimum).
+# The bit CLINGO_INTERRUPT is added when clingo is interrupted (time limit), the rest of codes are errors (65, 128, ...)
+CLINGO_EXIT_CODES = [10, 20, 30]
+CLINGO_INTERRUPT = 1
+# Strings and brackets of the JSON output of clingo (streaming parser of read_clingo_json). 
+# JSON_BRACKET only captures the brackets (the strings are found as '' to skip their content)
+JSON_STRING = r'"[^"\\]*(?:\\.[^"\\]*)*"'
+JSON_TOKEN = re.compile(JSON_STRING + r'|[\[\]{}]')
+JSON_BRACKET = re.compile(JSON_STRING + r'|([\[\]{}])')
+
+# Optimization strategy of clingo of each energy function: model-guided (bb) or core-guided (usc), with their
+# variants. The defaults are the fastest ones in the random sequences of the README (core-guided only pays off
+# for E2). Selected with the console parameter '--opt-strategy'
+OPT_STRATEGIES = {1: 'bb,lin', 2: 'usc,oll', 0: 'bb,lin'}
+OPT_STRATEGY = re.compile(r'(bb|usc)(,\w+)*')
+
+# Clingo profiles (configuration and heuristic) of each encoding and energy function found by the autotune command,
+# added to the clingo options if the file exists. Selected with the console parameters '--tuning' and '--no-tuning'
+TUNING_FILE = os.path.join(CLINGO_DIR,'tuning.json')
+# Candidates of the autotune command: presets of clingo (--configuration, auto is the default of clingo) and decision
+# heuristics (--heuristic, default: the one of the preset)
+CONFIGURATIONS = ['auto', 'frumpy', 'jumpy', 'tweety', 'trendy', 'crafty', 'handy']
+HEURISTICS = ['default', 'Berkmin', 'Vmtf', 'Vsids', 'Unit']
+AUTOTUNE_HEURISTICS = ['default', 'Berkmin', 'Vsids']
+AUTOTUNE_TIME_LIMIT = 60                                        # time limit of each run (seconds) if not given
+
+# Wall-clock limit of clingo in seconds (None: no limit). Selected with the console parameter '--time-limit'.
+# The prediction is the best model found in the time limit, which may not be proved optimal
+TIME_LIMIT = None
+
+# Number of clingo threads and how they solve the problem. Selected with the console parameters '--threads' and '--parallel-mode'
+THREADS = 1
+PARALLEL_MODES = ['compete',    # every thread solves the whole problem with a different configuration
+                  'split']      # the search space is split between the threads
+PARALLEL_MODE = 'compete'
 
 # Allowed bases.
 BASES = 'ACGU'
+# Allowed pairings (Watson-Crick and GU).
+PAIRINGS = ['AU','UA','CG','GC','GU','UG']
+# Minimum number of bases enclosed by a pairing and maximum distance between paired bases (None: no limit) of the candidate pairings
+MIN_LOOP = 1
+MAX_SPAN = None
+# Values of the learnable parameter c1 of energy 2 (R17 in rna_ss_prediction_E2.lp). 
+# It can be changed with the console parameter '--c1-grid' and it is written in the input file as c1_grid facts.
+C1_GRID = [40,50,60,70,80,100]
 CONSOLE_LINE_LENGTH_ = 80
 
+# JSON lines file of the timings of the stages of each prediction (metrics_record), written with the console parameter '--metrics'
+METRICS_FILE = os.path.join(STATS_DIR,'METRICS.jsonl')
+# Stages of the pipeline timed in Prediction.timings (only the ones done by the prediction): cache lookup and storage,
+# input facts, solving (clingo run, including its grounding and the reading of its output, or dp), parse of the model,
+# stats, image and whole pipeline
+STAGES = ['cache', 'input', 'solve', 'parse', 'statistics', 'image', 'total']
+
+# Persistent cache of the predictions (PredictionCache), used with the console parameter '--cache'
+CACHE_FILE = os.path.join('cache','predictions.sqlite')
+CACHE_SIZE = 10000                                              # maximum number of predictions kept
+# Versions of the clingo executables already asked {executable: version}
+CLINGO_VERSIONS = {}
+
+# Corpus of the bench command: the example sequences and BENCH_SEQUENCES random sequences (BENCH_SEED) of each length
+BENCH_EXAMPLES = ['AGUCCA', 'ACCUGGUAUCGACA', 'ACGAAAUCGAAACGCCCAUUUUGU', 'CCAAGAUGUGGAGGCUGGGGUCAG']
+BENCH_LENGTHS = [10, 25, 50, 100, 150, 200]
+BENCH_SEQUENCES = 2
+BENCH_SEED = 23
+BENCH_BUCKETS = [10, 25, 50, 100, 200]                          # upper limits of the length buckets of the summary
+BENCH_TIME_LIMIT = 60                                           # time limit of each prediction (seconds) if not given
+BENCH_GRACE = 10                                                # seconds after the time limit before a prediction is killed
+BENCH_FIELDS = ['id', 'length', 'energy', 'backend', 'engine', 'status', 'wall_time', 'ground_time', 'solve_time',
+                'first_model_time', 'models', 'optimization', 'peak_rss_mb', 'error']
+
+# Labels of the rules of the clingo programs (comments like %R3 or %R11_1 in the line of the rule), used by the diagnose command
+RULE_LABEL = re.compile(r'%\s*(R\d+(?:_\d+)*)\b')
+
+# Predictor of the batch command in each process of its pool
+BATCH_PREDICTOR = None
+
 ### FUNCTIONS
 def main():
     '''
     Main function. This program predicts the secondary structure of a RNA sequence
     using CLINGO and maximizing two possible Energy functions. It also generates an image 
     of the resulting structure using VARNA applet if Java is installed.
+    The prediction is computed by a Predictor with the options of the console parameters.
+    The subcommand 'batch' predicts the structures of the sequences of a file (batch) and
+    the subcommand 'autotune' finds the fastest clingo profile for them (autotune). The
+    subcommand 'bench' measures the pipeline with a fixed corpus of sequences (bench) and the
+    subcommand 'diagnose' attributes the ground program of a sequence to the rules (diagnose).
     '''
-    global SEQUENCE     # Input sequence global variable
-    global ENERGY_FILE  # ENERGY_FILE as global variable
-    global ENERGY_FUNC  # Input energy function value global variable
+    if sys.argv[1:2] == ['batch']:
+        batch(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ['autotune']:
+        autotune(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ['bench']:
+        bench(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ['diagnose']:
+        diagnose(sys.argv[2:])
+        return
 
     # Console argument parser
     parser = argparse.ArgumentParser(description='Secondary structure prediction of a RNA sequence with image generation.')
@@ -75,151 +293,1856 @@ def main():
                          help='RNA sequence [example: ACCGUA]')
     parser.add_argument('energy', type=int,
                         help='energy function used [possible values 1, 2 and 0]. Value 0 uses the original E2 function of the authors')
+    parser.add_argument('--metrics', type=str, nargs='?', const=METRICS_FILE, default=None,
+                        help='append the timings of the stages of the prediction to a JSON lines file [default file: {}]'.format(METRICS_FILE))
+    parser.add_argument('--timings', action='store_true',
+                        help='append the timings of the stages of the prediction to the stats file')
+    add_options(parser)
 
     args = parser.parse_args() 
 
-    SEQUENCE = args.sequence
-    not_valid_seq = any(x not in BASES for x in SEQUENCE)
+    not_valid_seq = any(x not in BASES for x in args.sequence)
     if not_valid_seq: 
         print('Invalid sequence. Sequence can only have the bases A,C,G,U.')
         sys.exit()
     
-    ENERGY_FUNC = args.energy
-    if ENERGY_FUNC not in [0,1,2]: 
+    if args.energy not in [0,1,2]: 
         print('Invalid energy function. Energy must be 0, 1 or 2.')
         sys.exit()
-    if ENERGY_FUNC == 0 : ENERGY_FUNC = '2_0'
-    ENERGY_FILE = ENERGY_FILE.format(ENERGY_FUNC)
+    predictor = Predictor(**read_options(args))
 
     print('='*CONSOLE_LINE_LENGTH_)
     print('SYSTEM PLATFORM USED: ',SYSTEM)
-    print('CLINGO EXECUTABLE RELATIVE PATH: ',CLINGO_EXE)
+    if predictor.engine == 'binary': print('CLINGO EXECUTABLE RELATIVE PATH: ',predictor.clingo_exe)
+    else: print('CLINGO PYTHON MODULE VERSION: ',clingo.__version__)
+    if predictor.cache is not None: print('PREDICTION CACHE: ',predictor.cache.path)
     print('='*CONSOLE_LINE_LENGTH_,'\n')
 
     ## Main pipeline
-    # Generates input file from input RNA sequence
-    generate_input_file()
-
-    # Executes Clingo program
-    run_clingo()
-
-    # parse the prediction
-    pairing_dict, connections = read_clingo_output()
+    start = time.perf_counter()
+    try: prediction = predictor.predict(args.sequence, args.energy)
+    except RuntimeError as error:
+        print(error)
+        sys.exit()
 
     # print stats
-    statistics(pairing_dict,connections)
+    predictor.statistics(prediction)
+
+    # Executes VARNA applet to generate image if java is installed (the other renderers do not need it)
+    if predictor.renderer != 'varna' or is_java_installed():
+        predictor.generate_image(prediction)
+    prediction.timings['total'] = time.perf_counter() - start
 
-    # Executes VARNA applet to generate image if java is installed
-    if is_java_installed():
-        generate_image(connections)
+    # timings of the stages
+    if args.timings: predictor.report_timings(prediction)
+    if args.metrics is not None: write_metrics(args.metrics, metrics_record(predictor, prediction))
     
     print('FINISHED. EXITING PROGRAM.')
 
+def add_options(parser):
+    '''
+    Adds the console parameters of the prediction shared by the single sequence and the
+    batch commands to parser (argparse).
+    '''
+    parser.add_argument('--encoding', choices=list(ENCODINGS), default='base',
+                        help='base encoding used [default: base]. Value nested grounds the no pseudo-knots constraint in quadratic size '
+                             'and value canpair also restricts the pairings to the precomputed candidate pairings. '
+                             'Value half is the canpair encoding representing each pairing only once')
+    parser.add_argument('--min-loop', type=int, default=MIN_LOOP,
+                        help='minimum number of bases enclosed by a pairing [default: {}]'.format(MIN_LOOP))
+    parser.add_argument('--max-span', type=int, default=MAX_SPAN,
+                        help='maximum distance between paired bases [default: no limit]')
+    parser.add_argument('--backend', choices=BACKENDS, default=BACKEND,
+                        help='solver used [default: clingo]. Value dp uses dynamic programming: the Nussinov algorithm for energy 1 '
+                             'and a dynamic programming over the counts of AU and CG pairings for energies 2 and 0')
+    parser.add_argument('--engine', choices=ENGINES, default=ENGINE,
+                        help='how clingo is run [default: api]. Value api uses the clingo python module in process '
+                             '(the executable is used if it is not installed) and value binary the clingo executable')
+    parser.add_argument('--multishot', action='store_true',
+                        help='solve the sequences of the api engine in the same clingo control (multi-shot solving), '
+                             'instead of a new control per sequence')
+    parser.add_argument('--multishot-sequences', type=int, default=MULTISHOT_SEQUENCES,
+                        help='sequences solved in a multi-shot control before it is created again, since the ground program '
+                             'of every sequence is kept in it [default: {}]'.format(MULTISHOT_SEQUENCES))
+    parser.add_argument('--threads', type=int, default=THREADS,
+                        help='number of threads used by clingo [default: {}]'.format(THREADS))
+    parser.add_argument('--parallel-mode', choices=PARALLEL_MODES, default=PARALLEL_MODE,
+                        help='how the clingo threads solve the problem [default: compete]. Value compete runs every thread '
+                             'on the whole problem and value split splits the search space between them')
+    parser.add_argument('--opt-strategy', type=str, action='append', default=[], metavar='[ENERGY=]STRATEGY',
+                        help='optimization strategy of clingo for an energy function (or all of them without energy), '
+                             'repeatable [default: 1=bb,lin 2=usc,oll 0=bb,lin, example: --opt-strategy 2=bb,dec]')
+    parser.add_argument('--tuning', type=str, default=TUNING_FILE,
+                        help='file of the clingo profiles found by the autotune command, used if it exists [default: {}]'.format(TUNING_FILE))
+    parser.add_argument('--no-tuning', action='store_true',
+                        help='use the default configuration and heuristic of clingo, ignoring the tuning file')
+    parser.add_argument('--time-limit', type=int, default=TIME_LIMIT,
+                        help='wall-clock limit of clingo in seconds: the best structure found is returned, flagged as not '
+                             'optimal if the optimum was not proved [default: no limit]')
+    parser.add_argument('--log', action='store_true',
+                        help='write the clingo output in the clingo output directory')
+    parser.add_argument('--compact', action='store_true',
+                        help='clingo only shows the pairings, contacts and energy of the answers, not the sequence')
+    parser.add_argument('--c1-grid', type=str, default=None,
+                        help='values of c1 of energy 2 separated by commas, ranges allowed [default: 40,50,60,70,80,100, example: 1:200]')
+    parser.add_argument('--renderer', choices=RENDERERS, default=RENDERER,
+                        help='how the image is drawn [default: varna]. Values radiate and arc draw it in python (rna_draw.py) '
+                             'as loops and stacks or as an arc diagram, without java')
+    parser.add_argument('--image-format', choices=IMAGE_FORMATS, default=IMAGE_FORMAT,
+                        help='format of the image [default: png]')
+    parser.add_argument('--cache', type=str, nargs='?', const=CACHE_FILE, default=None,
+                        help='reuse the optimal predictions stored in a SQLite cache file [default file: {}]'.format(CACHE_FILE))
+    parser.add_argument('--cache-size', type=int, default=CACHE_SIZE,
+                        help='maximum number of predictions of the cache, the least recently used ones are removed [default: {}]'.format(CACHE_SIZE))
+
+def read_options(args):
+    '''
+    Checks the console parameters added by add_options and returns them as the keyword
+    arguments of Predictor.
+    '''
+    options = {'encoding': args.encoding, 'backend': args.backend, 'parallel_mode': args.parallel_mode,
+               'log': args.log, 'compact': args.compact, 'renderer': args.renderer, 'image_format': args.image_format}
+
+    options['min_loop'] = args.min_loop
+    if args.min_loop < 1:
+        print('Invalid minimum loop. A base cannot be paired with itself or the successive, so minimum loop must be at least 1.')
+        sys.exit()
+    options['max_span'] = args.max_span
+    if args.max_span is not None and args.max_span < 1:
+        print('Invalid maximum span. Maximum span must be positive.')
+        sys.exit()
+
+    options['opt_strategies'] = {}
+    for value in args.opt_strategy:
+        energy, strategy = value.split('=', 1) if '=' in value else (None, value)
+        if energy not in [None, '0', '1', '2'] or OPT_STRATEGY.fullmatch(strategy) is None:
+            print('Invalid optimization strategy. It must be a clingo strategy (bb or usc, with its variants, e.g. bb,lin or usc,oll) '
+                  'optionally preceded by the energy function, e.g. 2=usc,oll.')
+            sys.exit()
+        for e in ([int(energy)] if energy is not None else [0, 1, 2]): options['opt_strategies'][e] = strategy
+
+    options['tuning'] = None if args.no_tuning else args.tuning
+
+    options['time_limit'] = args.time_limit
+    if args.time_limit is not None and args.time_limit < 1:
+        print('Invalid time limit. Time limit must be a positive number of seconds.')
+        sys.exit()
+
+    options['threads'] = args.threads
+    if args.threads < 1:
+        print('Invalid number of threads. Threads must be positive.')
+        sys.exit()
+    options['engine'] = args.engine
+    if args.backend == 'clingo' and args.engine == 'api' and clingo is None:
+        print('Clingo python module not found. Using the clingo executable.')
+        options['engine'] = 'binary'
+    options['multishot'] = args.multishot
+    options['multishot_sequences'] = args.multishot_sequences
+    if args.multishot_sequences < 1:
+        print('Invalid number of multi-shot sequences. It must be positive.')
+        sys.exit()
+    if args.multishot and (args.backend != 'clingo' or options['engine'] != 'api'):
+        print('Multi-shot solving is only available with the api engine of the clingo backend. Ignoring --multishot.')
+        options['multishot'] = False
+
+    if args.c1_grid is not None:
+        try: options['c1_grid'] = parse_c1_grid(args.c1_grid)
+        except ValueError: options['c1_grid'] = []
+        if len(options['c1_grid']) == 0 or min(options['c1_grid']) < 0:
+            print('Invalid c1 grid. It must be a list of non negative integers or ranges separated by commas, e.g. 40,50,60 or 1:200.')
+            sys.exit()
+
+    if args.cache is not None:
+        if args.cache_size < 1:
+            print('Invalid cache size. Cache size must be positive.')
+            sys.exit()
+        options['cache'] = PredictionCache(args.cache, args.cache_size)
+    return options
+
+def energy_name(energy):
+    '''
+    Name of the energy function (1, 2 or 0, the original E2 of the authors) in the file names.
+
+    Example: 0 -> '2_0'
+    '''
+    return '2_0' if energy == 0 else str(energy)
+
+@contextlib.contextmanager
+def timed(timings, name):
+    '''
+    Adds the time of the block to the stage name of timings (nothing if timings is None).
+    '''
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None: timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+
+def stage(name):
+    '''
+    Decorator of the methods of Predictor of a stage of the pipeline whose first argument is the
+    prediction: their time is added to the stage name of prediction.timings.
+    '''
+    def decorator(method):
+        @functools.wraps(method)
+        def timed_method(self, prediction, *args, **kwargs):
+            with timed(prediction.timings, name):
+                return method(self, prediction, *args, **kwargs)
+        return timed_method
+    return decorator
+
+@dataclass
+class Prediction:
+    '''
+    Predicted secondary structure of a sequence with an energy function (Predictor.predict).
+    '''
+    sequence: str
+    energy: int                                         # energy function (1, 2 or 0)
+    pairings: Dict[int, int]                            # pairing dictionary {i: j}, i < j (1-based)
+    structure: str                                      # parenthesis and dots connection string
+    optimization: Optional[int] = None                  # optimization value (minimized by clingo)
+    c1: Optional[int] = None                            # best c1 of energy 2
+    clingo: Optional['ClingoResult'] = None             # result of clingo (clingo backend)
+    optimal: Optional[bool] = None                      # the optimum was proved (False if stopped by the time limit)
+    lower_bound: Optional[int] = None                   # lower bound of the optimization value proved by clingo
+    cached: bool = False                                # read from the prediction cache
+    timings: Dict[str, float] = field(default_factory=dict) # seconds of each stage of the pipeline {stage: time} (STAGES)
+
+class Predictor:
+    '''
+    Secondary structure predictor of RNA sequences with the options of the console parameters
+    (see add_options). The state of each prediction (sequence, energy function, input and
+    output files) belongs to the call, so the same predictor can be used by several threads
+    or processes at the same time:
+
+        - no input file is written: the facts of each call are written in the standard input
+          of clingo (binary engine) or added to the program (api engine).
+        - the output files (clingo output, stats and images) are written with a temporary
+          name in their directory and renamed when they are complete (atomic_output).
+
+    The clingo profiles (configuration and heuristic) of the autotune command are read from the
+    tuning file when the predictor is created. With multishot, the api engine solves the sequences
+    in the same clingo control (ClingoSolver), created again every multishot_sequences sequences.
+
+    Example: Predictor(encoding='half').predict('ACCUGGUAUCGACA', 2).structure -> '(((.))).(.(.))'
+    '''
+
+    def __init__(self, encoding='base', min_loop=MIN_LOOP, max_span=MAX_SPAN, backend=BACKEND, engine=ENGINE,
+                 threads=THREADS, parallel_mode=PARALLEL_MODE, time_limit=TIME_LIMIT, log=CLINGO_LOG, compact=COMPACT_OUTPUT,
+                 c1_grid=C1_GRID, opt_strategies=None, tuning=TUNING_FILE, profiles=None, multishot=MULTISHOT,
+                 multishot_sequences=MULTISHOT_SEQUENCES, clingo_exe=None, cache=None, varna=None, renderer=RENDERER,
+                 image_format=IMAGE_FORMAT, verbose=True):
+        self.encoding = encoding
+        self.encoding_file = ENCODINGS[encoding]
+        self.min_loop = min_loop
+        self.max_span = max_span
+        self.backend = backend
+        self.engine = engine if clingo is not None else 'binary'
+        self.threads = threads
+        self.parallel_mode = parallel_mode
+        self.time_limit = time_limit
+        self.opt_strategies = {**OPT_STRATEGIES, **(opt_strategies or {})}
+        # clingo profiles of the tuning file, replaced by the given ones {energy: profile}
+        self.profiles = {**read_profiles(tuning, encoding), **(profiles or {})}
+        self.log = log
+        self.compact = compact
+        self.c1_grid = list(c1_grid)
+        self.multishot = multishot
+        self.multishot_sequences = multishot_sequences
+        self.clingo_exe = clingo_exe or CLINGO_EXE
+        self.cache = cache
+        self.varna = varna
+        self.renderer = renderer
+        self.image_format = image_format
+        self.verbose = verbose
+
+    def console(self, *args, **kwargs):
+        '''
+        Prints in console if verbose.
+        '''
+        if self.verbose: print(*args, **kwargs)
+
+    def predict(self, sequence, energy):
+        '''
+        Predicts the structure of sequence with the energy function (1, 2 or 0) with the selected
+        backend and clingo engine. Raises ValueError if the sequence or the energy are not valid,
+        and RuntimeError if clingo fails. Returns the prediction (Prediction).
+        '''
+        if len(sequence) == 0 or any(x not in BASES for x in sequence):
+            raise ValueError('Invalid sequence. Sequence can only have the bases A,C,G,U.')
+        if energy not in [0,1,2]:
+            raise ValueError('Invalid energy function. Energy must be 0, 1 or 2.')
+        timings = {}
+
+        if self.cache is not None:
+            with timed(timings, 'cache'):
+                key = self.cache_key(sequence, energy)
+                prediction = self.cache.get(key)
+            if prediction is not None:
+                prediction.timings = timings
+                self.console('PREDICTION FOUND IN CACHE: ',prediction.structure,'\n')
+                return prediction
+
+        if self.backend == 'dp':
+            # Computes the prediction with dynamic programming
+            with timed(timings, 'solve'):
+                prediction = self.run_dp(sequence, energy)
+        else:
+            # the input facts are timed apart by the run (input stage)
+            start = time.perf_counter()
+            if self.engine == 'api':
+                # Runs clingo in process adding the facts of the sequence directly
+                result = self.run_clingo_api(sequence, energy, timings)
+            else:
+                # Executes Clingo program with the facts of the sequence in its standard input
+                result = self.run_clingo(sequence, energy, timings)
+            timings['solve'] = time.perf_counter() - start - timings.get('input', 0.0)
+
+            # parse the prediction (the last model found, the optimum if clingo finished)
+            with timed(timings, 'parse'):
+                pairing_dict, c1 = read_clingo_output(result)
+                prediction = Prediction(sequence, energy, pairing_dict, connection_string(sequence, pairing_dict),
+                                        result.costs[0] if result.costs else None, c1, result, result.optimal,
+                                        result.lower_bound[0] if result.lower_bound else None)
+            if not result.optimal:
+                self.console('OPTIMUM NOT PROVED{}: {}\n'.format(' (TIME LIMIT)' if result.time_limit else '',
+                             'the structure is the best one found' if result.models else 'no structure found'))
+
+        # only the optimal predictions are kept (clingo may have been stopped before the optimum)
+        if self.cache is not None and prediction.optimal:
+            with timed(timings, 'cache'):
+                self.cache.put(key, prediction)
+        prediction.timings = timings
+        return prediction
+
+    def cache_key(self, sequence, energy):
+        '''
+        Returns the key of the prediction cache of sequence and energy: SHA-256 hash of
+        everything the prediction depends on (the sequence, the energy function, the content
+        of the programs of the backend, the pairing constraints, the c1 grid, the clingo
+        options and the version of clingo).
+        '''
+        if self.backend == 'dp':
+            with open(rna_dp.__file__, 'r', encoding='utf-8') as dp_file: programs = [dp_file.read()]
+            version = None
+        else:
+            programs = [clingo_program(self.encoding_file), clingo_program(ENERGY_FILE.format(energy_name(energy)))]
+            version = clingo.__version__ if self.engine == 'api' else clingo_version(self.clingo_exe)
+        key = [sequence, energy, self.backend, self.engine if self.backend == 'clingo' else None,
+               [hashlib.sha256(program.encode('utf-8')).hexdigest() for program in programs],
+               self.min_loop, self.max_span, self.c1_grid, self.clingo_options(energy), version]
+        return hashlib.sha256(json.dumps(key).encode('utf-8')).hexdigest()
+
+    def input_facts(self, sequence, sequence_id=None):
+        '''
+        Returns the clingo facts of the input file of sequence (input_facts).
+        '''
+        return input_facts(sequence, self.min_loop, self.max_span, self.c1_grid, sequence_id)
+
+    def clingo_output_path(self, sequence, energy):
+        '''
+        Returns the path of the clingo output file of the sequence and energy function
+        in the clingo output directory (written only with log).
+        '''
+        # Output file name has the sequence at the end of the name 
+        return os.path.join(CLINGO_OUTPUT_DIR, 'rna_ss_prediction_E{}_{}.txt'.format(energy_name(energy), sequence))
+
+    def run_clingo(self, sequence, energy, timings=None):
+        '''
+        Run clingo program 'rna_ss_prediction_E{energy function value}.lp' together
+        with the selected base encoding with the JSON output of clingo (--outf=2). The base
+        encoding without the include of the input file (clingo_program) and the facts of the
+        sequence are written in the standard input of clingo ('-'), so no input file is written
+        and several calls can run at the same time. The output is read while clingo runs 
+        (read_clingo_json) and showed in console. It is saved in the clingo output directory
+        only with log. The time of the input facts is added to timings (input stage).
+        Raises RuntimeError with the messages of clingo if it fails (exit code not in CLINGO_EXIT_CODES
+        or output without result). The output may be incomplete only if clingo was interrupted
+        with the time limit.
+        Returns the result of the execution (ClingoResult).
+        '''
+        # Clingo program file paths
+        lp_file = os.path.join(CLINGO_DIR,ENERGY_FILE.format(energy_name(energy)))
+
+        # Generates the input facts from input RNA sequence
+        self.console('PARSING SEQUENCE INTO CLINGO LP INPUT FACTS...')
+        with timed(timings, 'input'):
+            program = clingo_program(self.encoding_file) + '\n' + self.input_facts(sequence)
+        self.console('Input: {} (standard input)\n'.format(self.encoding_file))
+
+        # Run clingo program
+        cmd = '{} - {} --outf=2'.format(self.clingo_exe,lp_file)
+        # Pairing constraints (max_span=0 means no limit)
+        cmd += ' -c min_loop={} -c max_span={}'.format(self.min_loop, self.max_span or 0)
+        cmd += ''.join(' '+option for option in self.clingo_options(energy))
+        if self.time_limit is not None: cmd += ' --time-limit={}'.format(self.time_limit)
+        self.console('EXECUTING: ',cmd)
+        self.console('RUNNING CLINGO...')
+        self.console('='*CONSOLE_LINE_LENGTH_)
+        # the clingo messages (stderr) are kept in a file, out of the JSON document, and showed in console at the end
+        with tempfile.TemporaryFile(mode='w+') as messages_file:
+            process = subprocess.Popen(cmd, shell=True, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=messages_file,
+                                       universal_newlines=True)
+            # clingo reads the whole program before writing its output (it may have failed before reading it)
+            try:
+                process.stdin.write(program)
+                process.stdin.close()
+            except BrokenPipeError: pass
+
+            with atomic_output(self.clingo_output_path(sequence, energy)) if self.log else contextlib.nullcontext() as clingo_output_file:
+                def lines():
+                    for line in process.stdout:
+                        if clingo_output_file is not None: clingo_output_file.write(line)
+                        self.console(line, end='')
+                        yield line
+                # the output is incomplete if clingo is interrupted (only expected with the time limit)
+                try: result = read_clingo_json(lines(), partial=self.time_limit is not None)
+                except ValueError: result = None
+                process.wait()
+            messages_file.seek(0)
+            messages = messages_file.read()
+        sys.stderr.write(messages)
+        code = process.returncode
+        interrupted = self.time_limit is not None and code & CLINGO_INTERRUPT and code-CLINGO_INTERRUPT in [0]+CLINGO_EXIT_CODES
+        if code not in CLINGO_EXIT_CODES and not interrupted:
+            raise RuntimeError('Clingo failed (exit code {}): {}'.format(code, messages.strip() or 'no messages'))
+        # clingo only finishes without result ('UNKNOWN') when it is interrupted
+        if result is None or (result.result == 'UNKNOWN' and not interrupted):
+            raise RuntimeError('Clingo output without result (exit code {}): {}'.format(code, messages.strip() or 'no messages'))
+
+        self.console()
+        self.console('CLINGO EXECUTION DONE...\n')
+        return result
+
+    def clingo_options(self, energy):
+        '''
+        Returns the clingo command line options of both engines for the energy function selected
+        with the console parameters (optimization strategy, clingo profile of the tuning file,
+        threads, parallel mode and compact output).
+
+        Example: energy = 1, threads = 4, parallel_mode = 'split' -> ['--opt-strategy=bb,lin', '--parallel-mode=4,split']
+                 energy = 2, profile {'configuration': 'trendy', 'heuristic': 'Vsids'}
+                 -> ['--opt-strategy=usc,oll', '--configuration=trendy', '--heuristic=Vsids']
+        '''
+        options = ['--opt-strategy={}'.format(self.opt_strategies[energy])]
+        profile = self.profiles.get(energy, {})
+        if profile.get('configuration'): options.append('--configuration={}'.format(profile['configuration']))
+        if profile.get('heuristic'): options.append('--heuristic={}'.format(profile['heuristic']))
+        if self.threads > 1: options.append('--parallel-mode={},{}'.format(self.threads, self.parallel_mode))
+        if self.compact: options += ['-c', 'output=compact']
+        return options
+
+    def clingo_solver(self, energy):
+        '''
+        Returns the solver (ClingoSolver) of the selected base encoding, energy function, pairing
+        constraints and clingo options, created the first time it is needed (SOLVERS).
+        '''
+        energy_file = ENERGY_FILE.format(energy_name(energy))
+        key = (self.encoding_file, energy_file, self.min_loop, self.max_span, self.multishot, self.multishot_sequences,
+               tuple(self.clingo_options(energy)))
+        if key not in SOLVERS: 
+            SOLVERS[key] = ClingoSolver(self.encoding_file, energy_file, self.min_loop, self.max_span, self.multishot,
+                                        self.multishot_sequences, options=self.clingo_options(energy))
+        return SOLVERS[key]
+
+    def run_clingo_api(self, sequence, energy, timings=None):
+        '''
+        Runs the selected base encoding and 'rna_ss_prediction_E{energy function value}.lp' in
+        process with the clingo python module (ClingoSolver). The programs are read once per
+        process and the facts of the sequence are added to the program instead of written in
+        the input file, and the models are read from the clingo model objects instead of
+        parsing the clingo output. The models are showed in console like clingo. The time of
+        the input facts is added to timings (input stage).
+        Returns the result of the execution (ClingoResult) like run_clingo.
+        '''
+        solver = self.clingo_solver(energy)
+        self.console('RUNNING CLINGO (PYTHON MODULE {})...'.format(clingo.__version__))
+        self.console('='*CONSOLE_LINE_LENGTH_)
+
+        with atomic_output(self.clingo_output_path(sequence, energy)) if self.log else contextlib.nullcontext() as clingo_output_file:
+            def output(line):
+                self.console(line)
+                if clingo_output_file is not None: clingo_output_file.write(line+'\n')
+
+            def facts(sequence_id=None):
+                with timed(timings, 'input'): return self.input_facts(sequence, sequence_id)
+
+            result = solver.solve(facts, lambda number, symbols, costs: print_model(number, symbols, costs, output), self.time_limit)
+            print_result(result, output)
+        self.console()
+        self.console('CLINGO EXECUTION DONE...\n')
+        return result
+
+    def run_dp(self, sequence, energy):
+        '''
+        Computes the prediction with the dynamic programming solver of rna_dp.py instead
+        of clingo. The candidate pairings are the same ones written in the clingo input file.
+        Returns the prediction (Prediction) like predict.
+        '''
+        c1 = None
+        n = len(sequence)
+        candidates = candidate_pairings(sequence, self.min_loop, self.max_span)
+
+        if energy == 1:
+            self.console('RUNNING DYNAMIC PROGRAMMING SOLVER (NUSSINOV)...')
+            pairing_dict = rna_dp.nussinov(sequence, candidates)
+            optimization = -2*len(pairing_dict)
+        elif energy == 2:
+            self.console('RUNNING DYNAMIC PROGRAMMING SOLVER (PAIRING COUNTS)...')
+            pairing_dict, optimization = rna_dp.count_dp(sequence, candidates,
+                lambda pairings,au,cg: rna_dp.energy2(n,pairings,au,cg,self.c1_grid)[0])
+            au, cg = pairing_counts(sequence, pairing_dict)
+            c1 = rna_dp.energy2(n,len(pairing_dict),au,cg,self.c1_grid)[1]
+        else:
+            # energy 0 is maximized: clingo reports the optimization as -E
+            self.console('RUNNING DYNAMIC PROGRAMMING SOLVER (PAIRING COUNTS)...')
+            pairing_dict, optimization = rna_dp.count_dp(sequence, candidates,
+                lambda pairings,au,cg: -rna_dp.energy2_0(n,pairings,au,cg))
+        self.console('Optimization: ',optimization)
+        self.console('DYNAMIC PROGRAMMING DONE...\n')
+
+        return Prediction(sequence, energy, pairing_dict, connection_string(sequence, pairing_dict), int(optimization), c1,
+                          optimal=True, lower_bound=int(optimization))
+
+    @stage('statistics')
+    def statistics(self, prediction):
+        """
+        Generates information about the sequence and the predicted
+        secondary structure into a file and prints it.
+        """
+        sequence = prediction.sequence
+        counts = pairing_stats(sequence, prediction.pairings)
+        stats = {
+            'SEQUENCE LENGTH:':[counts['length'],'-'],
+            'NUM. PAIRINGS:':[counts['pairings'],'-'],
+            'NUM. PAIRED BASES:':[counts['paired_bases'],'-'],
+            'NUM. CG PAIRINGS:':[counts['cg_pairings'],'-'],
+            'NUM. AU PAIRINGS:':[counts['au_pairings'],'-'],
+            'NUM. GU PAIRINGS:':[counts['gu_pairings'],'-'],
+            'PROP.  CG PAIRINGS:':[counts['cg_prop'], '0.53'],
+            'PROP.  AU PAIRINGS:':[counts['au_prop'], '0.35'],
+            'PROP.  GU PAIRINGS:':[counts['gu_prop'], '0.12'],
+
+        }
+        if prediction.c1 is not None: stats['BEST C1 FOUND:'] = [prediction.c1, '-']
+
+        # File content
+        content = 'STATS OF SEQUENCE: E{} - {}\n'.format(energy_name(prediction.energy),sequence) 
+        content += '='*CONSOLE_LINE_LENGTH_+ '\n'
+
+        content += "{:<40} {:<40} \n".format('PAIRING DICTIONARY:', str(prediction.pairings)) 
+        content += "{:<40} {:<40} \n".format('SEQUENCE STRING:', sequence) 
+        content += "{:<40} {:<40} \n".format('PARENTHESIS AND DOTS CONNECTION STRING:', prediction.structure) 
+        content += "{:<40} {:<40} \n".format('OPTIMIZATION VALUE:', '-' if prediction.optimization is None else prediction.optimization)
+        content += "{:<40} {:<40} \n".format('OPTIMAL:', 'YES' if prediction.optimal else 'NO (NOT PROVED IN THE TIME LIMIT)'
+                                               if prediction.clingo is not None and prediction.clingo.time_limit else 'NO')
+        if prediction.lower_bound is not None and not prediction.optimal:
+            content += "{:<40} {:<40} \n".format('LOWER BOUND:', prediction.lower_bound)
+        content += '='*CONSOLE_LINE_LENGTH_+ '\n'
+        content += "{:<20} {:<20} {:<20}\n".format('', 'PREDICTED', 'EXPECTED') 
+        for k, v in stats.items():
+            pred, expected = v
+            content += "{:<20} {:<20.2f} {:<20}\n".format(k, pred, expected)
+        self.console(content)
+        self.console('='*CONSOLE_LINE_LENGTH_,'\n')
+
+        # write to file
+        with atomic_output(self.stats_file(prediction)) as stat_file:
+            stat_file.write(content)
+
+    def stats_file(self, prediction):
+        '''
+        Returns the path of the stats file of the prediction in the stats directory.
+        '''
+        return os.path.join(STATS_DIR, "STATS_{}_E{}.txt".format(prediction.sequence,energy_name(prediction.energy)))
+
+    def report_timings(self, prediction):
+        '''
+        Prints the timings of the stages of the prediction (and the grounding and solving times
+        of clingo) and appends them to its stats file.
+        '''
+        content = 'TIMINGS (s)\n'
+        content += '='*CONSOLE_LINE_LENGTH_+ '\n'
+        for name in STAGES:
+            if name in prediction.timings: content += "{:<40} {:<40.4f}\n".format(name.upper()+':', prediction.timings[name])
+        if prediction.clingo is not None:
+            clingo_times = {'CLINGO GROUNDING:': prediction.clingo.time - prediction.clingo.solve_time,
+                            'CLINGO SOLVING:': prediction.clingo.solve_time, 'CLINGO 1ST MODEL:': prediction.clingo.first_model_time,
+                            'CLINGO UNSAT:': prediction.clingo.unsat_time}
+            for k, v in clingo_times.items(): content += "{:<40} {:<40.4f}\n".format(k, v)
+        content += '='*CONSOLE_LINE_LENGTH_+ '\n'
+        self.console(content)
+
+        stats_file = self.stats_file(prediction)
+        with open(stats_file, 'r') as stat_file: content = stat_file.read() + content
+        with atomic_output(stats_file) as stat_file:
+            stat_file.write(content)
+
+    @stage('image')
+    def generate_image(self, prediction):
+        '''
+        Generate image of the predicted structure using VARNA applet, launched for the image or
+        drawn by the rendering worker of the predictor (varna, see VarnaWorker), or in python
+        with the radiate or arc layout of rna_draw.py (renderer). The image is written with a
+        temporary name that is renamed when it is complete.
+        '''
+
+        # image output name and path
+        image_name = prediction.sequence+'_'+energy_name(prediction.energy)+'.'+self.image_format
+        image_file = os.path.join(GENERATED_IMAGES_DIR,image_name)
+        image_title = "{}_E{}".format(prediction.sequence,energy_name(prediction.energy))
+        if self.renderer != 'varna':
+            self.console('DRAWING IMAGE ({} LAYOUT)...'.format(self.renderer.upper()))
+            with atomic_path(image_file) as temp_image:
+                rna_draw.draw(prediction.sequence, prediction.structure, temp_image, image_title, self.renderer)
+            return
+        self.console('RUNNING VARNA. GENERATING IMAGE...')
+        with atomic_path(image_file) as temp_image:
+            os.remove(temp_image)   # written by VARNA
+            if self.varna is not None:
+                self.varna.render(prediction.sequence, prediction.structure, image_title, temp_image)
+                return
+            # VARNA command
+            base_cmd = 'java -cp {} fr.orsay.lri.varna.applications.VARNAcmd'.format(VARNA_JAR)
+            params = ' -sequenceDBN {} -structureDBN {} -title {} -o {}'.format(prediction.sequence,prediction.structure,image_title,temp_image)
+            # VARNA applet run
+            os.system(base_cmd + params)
+
+class PredictionCache:
+    '''
+    Persistent cache of the predictions of a Predictor in a SQLite database (path), keyed by
+    Predictor.cache_key. It keeps at most size predictions, removing the least recently used
+    ones, and counts its hits and misses (in the database, shared by every process using it).
+    Each thread opens its own connection, so the cache can be shared like the predictor.
+    '''
+
+    def __init__(self, path=CACHE_FILE, size=CACHE_SIZE):
+        self.path = path
+        self.size = size
+        self.local = threading.local()
+
+    def __getstate__(self):
+        # the connections are not sent to the processes of a pool
+        return {'path': self.path, 'size': self.size}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def connection(self):
+        '''
+        Returns the connection of the current thread, creating the database the first time.
+        '''
+        if getattr(self.local, 'connection', None) is None:
+            if os.path.dirname(self.path): os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=60)
+            connection.execute('PRAGMA journal_mode=WAL')
+            with connection:
+                connection.execute('CREATE TABLE IF NOT EXISTS predictions (key TEXT PRIMARY KEY, prediction TEXT, used REAL)')
+                connection.execute('CREATE INDEX IF NOT EXISTS predictions_used ON predictions (used)')
+                connection.execute('CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER)')
+                connection.execute("INSERT OR IGNORE INTO counters VALUES ('hits', 0), ('misses', 0)")
+            self.local.connection = connection
+        return self.local.connection
+
+    def get(self, key):
+        '''
+        Returns the prediction (Prediction) of key, or None if it is not in the cache.
+        '''
+        connection = self.connection()
+        with connection:
+            row = connection.execute('SELECT prediction FROM predictions WHERE key = ?', (key,)).fetchone()
+            connection.execute('UPDATE counters SET value = value + 1 WHERE name = ?', ('hits' if row else 'misses',))
+            if row is None: return None
+            connection.execute('UPDATE predictions SET used = ? WHERE key = ?', (time.time(), key))
+        values = json.loads(row[0])
+        values['pairings'] = {int(i): j for i, j in values['pairings'].items()}
+        if values['clingo'] is not None: values['clingo'] = ClingoResult(**values['clingo'])
+        values['cached'] = True
+        values['optimal'] = True        # only the optimal predictions are stored
+        return Prediction(**values)
+
+    def put(self, key, prediction):
+        '''
+        Stores the prediction of key, removing the least recently used predictions beyond size.
+        '''
+        connection = self.connection()
+        with connection:
+            connection.execute('INSERT OR REPLACE INTO predictions VALUES (?, ?, ?)',
+                               (key, json.dumps(asdict(prediction)), time.time()))
+            connection.execute('DELETE FROM predictions WHERE key IN (SELECT key FROM predictions ORDER BY used DESC LIMIT -1 OFFSET ?)',
+                               (self.size,))
+
+    def counters(self):
+        '''
+        Returns the number of predictions, hits and misses of the cache.
+
+        Example: {'predictions': 80, 'hits': 20, 'misses': 80}
+        '''
+        connection = self.connection()
+        counters = dict(connection.execute('SELECT name, value FROM counters'))
+        counters['predictions'] = connection.execute('SELECT COUNT(*) FROM predictions').fetchone()[0]
+        return {name: counters[name] for name in ['predictions', 'hits', 'misses']}
+
+class VarnaWorker:
+    '''
+    Long-lived VARNA rendering worker: one JVM running VARNA_WORKER, which keeps VARNA loaded
+    and draws the images of a stream of jobs (render) instead of launching a JVM per image.
+    The JVM is started with the first job (or start) and again if it stops. The jobs of
+    several threads are sent one at a time, and each process of a pool starts its own JVM.
+    Java 11 or newer is needed to run VARNA_WORKER as a source file.
+
+    Example: VarnaWorker().render('ACCUGGUAUCGACA', '(((.))).(.(.))', 'ACCUGGUAUCGACA_E2', 'image.png')
+    '''
+
+    def __init__(self, java='java'):
+        self.java = java
+        self.process = None
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        # the JVM is not sent to the processes of a pool
+        return {'java': self.java}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def start(self):
+        '''
+        Starts the JVM of the worker. Raises RuntimeError if it does not start.
+        '''
+        self.process = subprocess.Popen([self.java, '-cp', VARNA_JAR, VARNA_WORKER], stdin=subprocess.PIPE,
+                                        stdout=subprocess.PIPE, universal_newlines=True)
+        if self.process.stdout.readline().strip() != 'READY':
+            self.close()
+            raise RuntimeError('VARNA worker could not be started (java 11 or newer is needed).')
+
+    def render(self, sequence, structure, title, output):
+        '''
+        Draws the structure (dot-bracket) of sequence with the title in the output image file.
+        Raises RuntimeError if VARNA fails.
+        '''
+        with self.lock:
+            if self.process is None or self.process.poll() is not None: self.start()
+            try:
+                self.process.stdin.write('\t'.join([sequence, structure, title, output]) + '\n')
+                self.process.stdin.flush()
+                answer = self.process.stdout.readline().strip()
+            except OSError:
+                answer = ''
+        if answer != 'OK':
+            raise RuntimeError('VARNA error: ' + (answer[len('ERROR '):] if answer else 'the worker stopped'))
+
+    def close(self, timeout=VARNA_CLOSE_TIMEOUT):
+        '''
+        Stops the JVM of the worker: it ends when its standard input is closed, and it is killed
+        if it has not ended after timeout seconds (e.g. VARNA hung drawing an image).
+        '''
+        if self.process is not None:
+            try: self.process.stdin.close()
+            except OSError: pass
+            try: self.process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+            self.process = None
+
+def batch(argv):
+    '''
+    Batch command: predicts the structures of the sequences of a FASTA file (or a file with
+    one sequence per line) with each energy function and writes one JSON line per sequence
+    and energy in the order of the file. Identical sequences are predicted once and the
+    predictions are distributed among a pool of processes with the same Predictor
+    (batch_prediction). With images, the images are drawn as the predictions are done by one
+    VARNA rendering worker (VarnaWorker) instead of launching a JVM per image. With metrics,
+    the timings of the stages of each prediction are appended to the metrics file.
+
+    Example row: {"id": "seq1", "sequence": "ACCUGGUAUCGACA", "energy": 2, "structure": "(((.))).(.(.))",
+                  "pairings": [[1, 7], ...], "optimization": 80, "c1": 70, "stats": {"length": 14, ...}}
+    '''
+    parser = argparse.ArgumentParser(prog='rna_prediction.py batch',
+                                     description='Secondary structure prediction of the RNA sequences of a file.')
+    parser.add_argument('input', type=str,
+                        help='FASTA file or file with one RNA sequence per line')
+    parser.add_argument('energy', type=int, nargs='+',
+                        help='energy functions used [possible values 1, 2 and 0]')
+    parser.add_argument('--output', type=str, default=None,
+                        help='JSONL output file [default: {}]'.format(os.path.join(STATS_DIR,'BATCH_{input file name}.jsonl')))
+    parser.add_argument('--processes', type=int, default=os.cpu_count(),
+                        help='number of processes [default: number of CPUs]')
+    parser.add_argument('--images', action='store_true',
+                        help='generate the images of the structures (with the varna renderer, with one VARNA rendering worker)')
+    parser.add_argument('--metrics', type=str, nargs='?', const=METRICS_FILE, default=None,
+                        help='append the timings of the stages of each prediction to a JSON lines file [default file: {}]'.format(METRICS_FILE))
+    add_options(parser)
+
+    args = parser.parse_args(argv)
+    if any(energy not in [0,1,2] for energy in args.energy):
+        print('Invalid energy function. Energy must be 0, 1 or 2.')
+        sys.exit()
+    predictor = Predictor(verbose=False, **read_options(args))
+    processes = args.processes
+    if processes < 1:
+        print('Invalid number of processes. Processes must be positive.')
+        sys.exit()
+    output = args.output or os.path.join(STATS_DIR, 'BATCH_{}.jsonl'.format(os.path.splitext(os.path.basename(args.input))[0]))
+
+    records = read_sequences(args.input)
+    energies = list(dict.fromkeys(args.energy))
+    valid = lambda sequence: len(sequence) > 0 and all(x in BASES for x in sequence)
+    # predictions of the different valid sequences and energies in order of appearance
+    tasks = list(dict.fromkeys((sequence, energy) for _, sequence in records if valid(sequence) for energy in energies))
+    print('PREDICTING {} SEQUENCES ({} PREDICTIONS) WITH {} PROCESSES...'.format(len(records), len(tasks), processes))
+    start = time.perf_counter()
+    cache_counters = predictor.cache.counters() if predictor.cache is not None else None
+    images = args.images and (predictor.renderer != 'varna' or is_java_installed())
+    if images:
+        varna = None
+        if predictor.renderer == 'varna':
+            varna = VarnaWorker()
+            try: varna.start()
+            except RuntimeError as error:
+                print(error, 'Launching VARNA per image.')
+                varna = None
+        # the images are drawn in this process (the predictor of the pool has no worker)
+        image_predictor = Predictor(verbose=False, varna=varna, renderer=predictor.renderer, image_format=predictor.image_format)
+    image_time = 0.0
+
+    predictions = {}
+    written = 0         # records written
+    def write_rows(output_file):
+        # rows of the next records whose predictions are done, in order
+        nonlocal written
+        while written < len(records):
+            name, sequence = records[written]
+            if valid(sequence) and any((sequence, energy) not in predictions for energy in energies): return
+            for energy in energies:
+                row = {'id': name, 'sequence': sequence, 'energy': energy}
+                if valid(sequence) and isinstance(predictions[(sequence, energy)], RuntimeError):
+                    row['error'] = str(predictions[(sequence, energy)])
+                elif valid(sequence): row.update(batch_row(predictions[(sequence, energy)]))
+                else: row['error'] = 'Invalid sequence. Sequence can only have the bases A,C,G,U.'
+                output_file.write(json.dumps(row)+'\n')
+            written += 1
+
+    pool = multiprocessing.Pool(processes, set_batch_predictor, (predictor,)) if processes > 1 else None
+    set_batch_predictor(predictor)
+    with atomic_output(output) as output_file:
+        write_rows(output_file)
+        for task, prediction in zip(tasks, pool.imap(batch_prediction, tasks) if pool else map(batch_prediction, tasks)):
+            predictions[task] = prediction
+            write_rows(output_file)
+            if isinstance(prediction, RuntimeError):
+                print('{} E{}: {}'.format(task[0], energy_name(task[1]), prediction))
+                continue
+            if images:
+                image_start = time.perf_counter()
+                try: image_predictor.generate_image(prediction)
+                except RuntimeError as error: print(error)
+                image_time += time.perf_counter()-image_start
+            if args.metrics is not None: write_metrics(args.metrics, metrics_record(predictor, prediction))
+    if pool is not None: pool.close()
+    if images and image_predictor.varna is not None: image_predictor.varna.close()
+
+    print('BATCH DONE IN {:.2f}s. Output File: {}'.format(time.perf_counter()-start, output))
+    if images:
+        print('{} IMAGES GENERATED IN {:.2f}s ({:.1f} IMAGES/S). Output Directory: {}'.format(len(tasks), image_time,
+              len(tasks)/image_time if image_time > 0 else 0, GENERATED_IMAGES_DIR))
+    if cache_counters is not None:
+        counters = predictor.cache.counters()
+        print('CACHE: {} HITS, {} MISSES, {} PREDICTIONS STORED'.format(counters['hits']-cache_counters['hits'],
+              counters['misses']-cache_counters['misses'], counters['predictions']))
+
+def read_sequences(path):
+    '''
+    Returns the (name, sequence) records of a FASTA file or of a file with one sequence per
+    line, named by their line number. Empty lines and FASTA comments (';') are skipped.
+    '''
+    records = []
+    fasta = False
+    with open(path, 'r') as input_file:
+        for number, line in enumerate(input_file, start=1):
+            line = line.strip()
+            if len(line) == 0 or line.startswith(';'): continue
+            if line.startswith('>'):
+                fasta = True
+                records.append((line[1:].strip() or str(number), ''))
+            elif fasta: records[-1] = (records[-1][0], records[-1][1] + line.upper())
+            else: records.append((str(number), line.upper()))
+    return records
+
+def set_batch_predictor(predictor):
+    '''
+    Sets the predictor of the batch command in a process of its pool.
+    '''
+    global BATCH_PREDICTOR
+    BATCH_PREDICTOR = predictor
+
+def batch_prediction(task):
+    '''
+    Predicts the structure of a sequence with an energy function (task) with the predictor of the
+    batch command, without stats file or image. Returns the prediction (Prediction), or the
+    error if clingo fails (RuntimeError), written in the row of the prediction.
+    '''
+    try: return BATCH_PREDICTOR.predict(*task)
+    except RuntimeError as error: return error
+
+def batch_row(prediction):
+    '''
+    Returns the values of the batch row of a prediction.
+    '''
+    return {'structure': prediction.structure, 'pairings': [[k, v] for k, v in prediction.pairings.items()],
+            'optimization': prediction.optimization, 'optimal': prediction.optimal, 'lower_bound': prediction.lower_bound,
+            'c1': prediction.c1, 'stats': pairing_stats(prediction.sequence, prediction.pairings)}
+
+def autotune(argv):
+    '''
+    Autotune command: predicts the sequences of a FASTA file (or a file with one sequence per
+    line) with each energy function under every candidate clingo profile (a preset of
+    --configuration with a decision --heuristic), in parallel in a pool of processes. The
+    profiles are ranked by the number of sequences not solved in the time limit, the median
+    and the 95th percentile of the time to the optimum, and the best one of each energy is
+    written in the tuning file for the encoding, where the predictors read it (read_profiles).
+
+    Example: python rna_prediction.py autotune library.fa 1 2 --encoding half --processes 4
+    '''
+    parser = argparse.ArgumentParser(prog='rna_prediction.py autotune',
+                                     description='Search of the fastest clingo configuration and heuristic for the RNA sequences of a file.')
+    parser.add_argument('input', type=str,
+                        help='FASTA file or file with one RNA sequence per line')
+    parser.add_argument('energy', type=int, nargs='+',
+                        help='energy functions tuned [possible values 1, 2 and 0]')
+    parser.add_argument('--configurations', type=str, default=','.join(CONFIGURATIONS),
+                        help='clingo configurations tried, separated by commas [default: {}]'.format(','.join(CONFIGURATIONS)))
+    parser.add_argument('--heuristics', type=str, default=','.join(AUTOTUNE_HEURISTICS),
+                        help='clingo heuristics tried, separated by commas [default: {}, possible values {}]'.format(
+                             ','.join(AUTOTUNE_HEURISTICS), ','.join(HEURISTICS)))
+    parser.add_argument('--processes', type=int, default=os.cpu_count(),
+                        help='number of processes [default: number of CPUs]')
+    add_options(parser)
+
+    args = parser.parse_args(argv)
+    if any(energy not in [0,1,2] for energy in args.energy):
+        print('Invalid energy function. Energy must be 0, 1 or 2.')
+        sys.exit()
+    if args.backend != 'clingo':
+        print('Invalid backend. Only the clingo backend can be tuned.')
+        sys.exit()
+    configurations = args.configurations.split(',')
+    heuristics = args.heuristics.split(',')
+    if any(configuration not in CONFIGURATIONS for configuration in configurations):
+        print('Invalid configuration. Configurations must be some of {}.'.format(','.join(CONFIGURATIONS)))
+        sys.exit()
+    if any(heuristic not in HEURISTICS for heuristic in heuristics):
+        print('Invalid heuristic. Heuristics must be some of {}.'.format(','.join(HEURISTICS)))
+        sys.exit()
+    if args.processes < 1:
+        print('Invalid number of processes. Processes must be positive.')
+        sys.exit()
+    options = read_options(args)
+    # the times are measured without the cache and the profiles of the tuning file
+    options.update(cache=None, tuning=None, time_limit=args.time_limit or AUTOTUNE_TIME_LIMIT)
+    tuning = args.tuning
+
+    sequences = list(dict.fromkeys(sequence for _, sequence in read_sequences(args.input)
+                                   if len(sequence) > 0 and all(x in BASES for x in sequence)))
+    if len(sequences) == 0:
+        print('No valid sequences in {}.'.format(args.input))
+        sys.exit()
+    energies = list(dict.fromkeys(args.energy))
+    profiles = [{'configuration': configuration, 'heuristic': None if heuristic == 'default' else heuristic}
+                for configuration in configurations for heuristic in heuristics]
+    tasks = [(Predictor(verbose=False, profiles={energy: profile}, **options), sequence, energy)
+             for energy in energies for profile in profiles for sequence in sequences]
+    print('TUNING {} PROFILES WITH {} SEQUENCES ({} PREDICTIONS, TIME LIMIT {}s) WITH {} PROCESSES...'.format(
+          len(profiles), len(sequences), len(tasks), options['time_limit'], args.processes))
+
+    pool = multiprocessing.Pool(args.processes) if args.processes > 1 else None
+    times = iter(pool.imap(autotune_prediction, tasks) if pool else map(autotune_prediction, tasks))
+    tuned = {}
+    for energy in energies:
+        ranking = []
+        for profile in profiles:
+            profile_times = [next(times) for _ in sequences]
+            solved = sum(t != math.inf for t in profile_times)
+            ranking.append((len(sequences)-solved, percentile(profile_times, 50), percentile(profile_times, 95), profile))
+        ranking.sort(key=lambda row: row[:3])
+
+        print('='*CONSOLE_LINE_LENGTH_)
+        print('E{} ({} ENCODING): TIME TO OPTIMUM OF {} SEQUENCES'.format(energy_name(energy), args.encoding.upper(), len(sequences)))
+        print("{:<6} {:<15} {:<12} {:<8} {:<12} {:<12}".format('RANK', 'CONFIGURATION', 'HEURISTIC', 'SOLVED', 'MEDIAN (s)', 'P95 (s)'))
+        for rank, (unsolved, median, p95, profile) in enumerate(ranking, start=1):
+            print("{:<6} {:<15} {:<12} {:<8} {:<12} {:<12}".format(rank, profile['configuration'], profile['heuristic'] or 'default',
+                  '{}/{}'.format(len(sequences)-unsolved, len(sequences)), '{:.3f}'.format(median) if median != math.inf else '-',
+                  '{:.3f}'.format(p95) if p95 != math.inf else '-'))
+        unsolved, median, p95, profile = ranking[0]
+        tuned[energy_name(energy)] = dict(profile, median=None if median == math.inf else round(median, 4),
+                                          p95=None if p95 == math.inf else round(p95, 4), solved=len(sequences)-unsolved,
+                                          sequences=len(sequences), corpus=args.input)
+    if pool is not None: pool.close()
+    print('='*CONSOLE_LINE_LENGTH_)
+
+    # the profiles of the other encodings and energy functions are kept
+    content = {}
+    if os.path.exists(tuning):
+        with open(tuning, 'r', encoding='utf-8') as tuning_file: content = json.load(tuning_file)
+    content.setdefault(args.encoding, {}).update(tuned)
+    if os.path.dirname(tuning): os.makedirs(os.path.dirname(tuning), exist_ok=True)
+    with atomic_output(tuning) as tuning_file:
+        json.dump(content, tuning_file, indent=4)
+        tuning_file.write('\n')
+    print('PROFILES WRITTEN IN {}: {}'.format(tuning, ', '.join('E{} {}'.format(energy, ' '.join(
+          '--{}={}'.format(option, profile[option]) for option in ['configuration', 'heuristic'] if profile[option]))
+          for energy, profile in tuned.items())))
+
+def autotune_prediction(task):
+    '''
+    Predicts the structure of a sequence with an energy function with a predictor (task) of the
+    autotune command. Returns its time in seconds, infinite if the optimum was not proved or the
+    prediction failed (e.g. clingo rejects the profile), like the errors of batch_prediction.
+    '''
+    predictor, sequence, energy = task
+    start = time.perf_counter()
+    try: prediction = predictor.predict(sequence, energy)
+    except (RuntimeError, ValueError) as error:
+        print('{} E{}: {}'.format(sequence, energy_name(energy), error))
+        return math.inf
+    return time.perf_counter()-start if prediction.optimal else math.inf
+
+def percentile(values, q):
+    '''
+    Nearest-rank percentile q (0-100) of values.
+
+    Example: [3, 1, 2, 4], 50 -> 2
+    '''
+    values = sorted(values)
+    return values[max(0, math.ceil(q*len(values)/100)-1)]
+
+def read_profiles(path, encoding):
+    '''
+    Returns the clingo profiles of the encoding of the tuning file path (written by the autotune
+    command), or no profiles if path is None or the file does not exist.
 
+    Example: {1: {'configuration': 'trendy', 'heuristic': None, ...}, 2: {'configuration': 'handy', ...}}
+    '''
+    if path is None or not os.path.exists(path): return {}
+    with open(path, 'r', encoding='utf-8') as tuning_file:
+        profiles = json.load(tuning_file).get(encoding, {})
+    return {0 if energy == '2_0' else int(energy): profile for energy, profile in profiles.items()}
 
-def generate_input_file():
+def bench(argv):
     '''
-    Generates the file CLINGO_INPUT_FILE parsing a raw sequence into 
-    clingo facts.
+    Bench command: predicts a fixed corpus (the example sequences and random sequences of
+    BENCH_LENGTHS, the same ones in every run) with every energy function and backend, each
+    prediction in a new process (bench_prediction), killed if it does not finish in the time
+    limit. Writes a CSV and a JSON file with one row per prediction (BENCH_FIELDS: grounding,
+    solving and first model times of clingo, models, peak memory and wall time) and prints the
+    medians per length bucket (bench_summary).
 
-    Example: ACCG -> seq(1,a). seq(2.C). seq(3,c). seq(4,G)
+    Example row: {"id": "example_2", "length": 14, "energy": 2, "backend": "clingo", "engine": "api", "status": "optimal",
+                  "wall_time": 0.034, "ground_time": 0.021, "solve_time": 0.012, "first_model_time": 0.004, "models": 3, ...}
     '''
+    parser = argparse.ArgumentParser(prog='rna_prediction.py bench',
+                                     description='Benchmark of the prediction pipeline with a fixed corpus of RNA sequences.')
+    parser.add_argument('--lengths', type=str, default=','.join(str(length) for length in BENCH_LENGTHS),
+                        help='lengths of the random sequences separated by commas [default: {}]'.format(','.join(str(length) for length in BENCH_LENGTHS)))
+    parser.add_argument('--sequences', type=int, default=BENCH_SEQUENCES,
+                        help='random sequences of each length [default: {}]'.format(BENCH_SEQUENCES))
+    parser.add_argument('--energies', type=str, default='1,2,0',
+                        help='energy functions separated by commas [default: 1,2,0]')
+    parser.add_argument('--backends', type=str, default=','.join(BACKENDS),
+                        help='backends separated by commas [default: {}]'.format(','.join(BACKENDS)))
+    parser.add_argument('--output', type=str, default=os.path.join(STATS_DIR,'BENCH'),
+                        help='output files without extension, written as CSV and JSON [default: {}]'.format(os.path.join(STATS_DIR,'BENCH')))
+    add_options(parser)
 
+    args = parser.parse_args(argv)
+    try:
+        lengths = [int(length) for length in args.lengths.split(',')]
+        energies = list(dict.fromkeys(int(energy) for energy in args.energies.split(',')))
+    except ValueError: lengths, energies = [0], [-1]
+    if min(lengths) < 1:
+        print('Invalid lengths. Lengths must be positive integers separated by commas.')
+        sys.exit()
+    if any(energy not in [0,1,2] for energy in energies):
+        print('Invalid energy function. Energy must be 0, 1 or 2.')
+        sys.exit()
+    backends = list(dict.fromkeys(args.backends.split(',')))
+    if any(backend not in BACKENDS for backend in backends):
+        print('Invalid backend. Backends must be some of {}.'.format(','.join(BACKENDS)))
+        sys.exit()
+    if args.sequences < 0:
+        print('Invalid number of sequences. It must be non negative.')
+        sys.exit()
+    options = read_options(args)
+    # every prediction is measured, without the cache
+    options.update(cache=None, time_limit=args.time_limit or BENCH_TIME_LIMIT)
+    options.pop('backend')
+
+    corpus = bench_corpus(lengths, args.sequences)
+    predictors = {backend: Predictor(verbose=False, backend=backend, **options) for backend in backends}
+    tasks = [(name, sequence, energy, backend) for name, sequence in corpus for energy in energies for backend in backends]
+    print('BENCHMARK OF {} SEQUENCES ({} PREDICTIONS, TIME LIMIT {}s)...'.format(len(corpus), len(tasks), options['time_limit']))
+
+    rows = []
+    start = time.perf_counter()
+    for name, sequence, energy, backend in tasks:
+        predictor = predictors[backend]
+        row = {'id': name, 'length': len(sequence), 'energy': energy, 'backend': backend,
+               'engine': predictor.engine if backend == 'clingo' else None}
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(target=bench_prediction, args=(predictor, sequence, energy, sender))
+        process.start()
+        sender.close()
+        measures = None
+        killed = not receiver.poll(predictor.time_limit + BENCH_GRACE)
+        # the pipe is also closed without measures if the process dies (e.g. out of memory)
+        if not killed:
+            try: measures = receiver.recv()
+            except EOFError: pass
+        if process.is_alive(): process.terminate()
+        process.join()
+        if measures is not None: row.update(measures)
+        elif killed: row['status'] = 'killed'
+        else: row.update(status='error', error='the prediction process died (exit code {})'.format(process.exitcode))
+        rows.append({field: row.get(field) for field in BENCH_FIELDS})
+        print('{:<14} {:>4} BASES E{:<4} {:<7} {:<14} {}'.format(name, len(sequence), energy_name(energy), backend, row['status'],
+              '-' if row.get('wall_time') is None else '{:.3f}s'.format(row['wall_time'])))
+    summary = bench_summary(rows)
+
+    print('='*CONSOLE_LINE_LENGTH_)
+    print('MEDIAN TIMES (s) AND MAXIMUM PEAK RSS (MB) PER LENGTH BUCKET')
+    header = "{:<10} {:<6} {:<8} {:<8} {:<9} {:<9} {:<9} {:<9} {:<9}"
+    print(header.format('LENGTH', 'ENERGY', 'BACKEND', 'SOLVED', 'WALL', 'GROUND', 'SOLVE', '1ST MODEL', 'RSS'))
+    number = lambda value, digits=3: '-' if value is None else '{:.{}f}'.format(value, digits)
+    for bucket in summary:
+        print(header.format(bucket['lengths'], 'E'+energy_name(bucket['energy']), bucket['backend'],
+              '{}/{}'.format(bucket['solved'], bucket['runs']), number(bucket['wall_time']), number(bucket['ground_time']),
+              number(bucket['solve_time']), number(bucket['first_model_time']), number(bucket['peak_rss_mb'], 1)))
+    print('='*CONSOLE_LINE_LENGTH_)
+
+    if os.path.dirname(args.output): os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with atomic_output(args.output+'.csv') as csv_file:
+        writer = csv.DictWriter(csv_file, BENCH_FIELDS, lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(rows)
+    with atomic_output(args.output+'.json') as json_file:
+        json.dump({'options': {key: value for key, value in options.items() if key != 'tuning'}, 'rows': rows, 'summary': summary},
+                  json_file, indent=1)
+        json_file.write('\n')
+    print('BENCHMARK DONE IN {:.2f}s. Output Files: {}.csv, {}.json'.format(time.perf_counter()-start, args.output, args.output))
+
+def bench_corpus(lengths, sequences):
+    '''
+    Returns the (name, sequence) records of the corpus of the bench command: the example
+    sequences and the random sequences of each length, generated with BENCH_SEED so every run
+    predicts the same ones.
+
+    Example: [10], 1 -> [('example_1', 'AGUCCA'), ..., ('random_10_1', 'GCAUUGACGU')]
+    '''
+    generator = random.Random(BENCH_SEED)
+    corpus = [('example_{}'.format(i), sequence) for i, sequence in enumerate(BENCH_EXAMPLES, start=1)]
+    for length in lengths:
+        for k in range(1, sequences+1):
+            corpus.append(('random_{}_{}'.format(length, k), ''.join(generator.choice(BASES) for _ in range(length))))
+    return corpus
+
+def bench_prediction(predictor, sequence, energy, connection):
+    '''
+    Predicts the structure of sequence with the energy function with predictor in a process of the
+    bench command and sends its measures through connection: status ('optimal', 'time limit' or
+    'not optimal'), wall time, grounding, solving and first model times, models and optimization of
+    clingo, and the peak resident memory of the process or of the clingo executable (binary engine).
+    If the prediction fails, the status is 'error' with the error.
+    '''
+    start = time.perf_counter()
+    try: prediction = predictor.predict(sequence, energy)
+    except Exception as error:
+        connection.send({'status': 'error', 'wall_time': round(time.perf_counter()-start, 4),
+                         'error': '{}: {}'.format(type(error).__name__, error)})
+        connection.close()
+        return
+    measures = {'wall_time': time.perf_counter()-start, 'optimization': prediction.optimization,
+                'status': 'optimal' if prediction.optimal else 'time limit'
+                          if prediction.clingo is not None and prediction.clingo.time_limit else 'not optimal'}
+    if prediction.clingo is not None:
+        measures.update(ground_time=prediction.clingo.time-prediction.clingo.solve_time, solve_time=prediction.clingo.solve_time,
+                        first_model_time=prediction.clingo.first_model_time, models=prediction.clingo.models)
+    if resource is not None:
+        # kilobytes in Linux, bytes in MacOS
+        rss = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+        measures['peak_rss_mb'] = rss/(2**20 if SYSTEM == 'darwin' else 2**10)
+    connection.send({name: round(value, 4) if isinstance(value, float) else value for name, value in measures.items()})
+    connection.close()
+
+def bench_summary(rows):
+    '''
+    Returns the summary of the rows of the bench command per length bucket (BENCH_BUCKETS),
+    energy function and backend: runs, optimal predictions, medians of the times of the optimal
+    ones and maximum peak memory.
+
+    Example: {"lengths": "11-25", "energy": 2, "backend": "clingo", "runs": 4, "solved": 4, "wall_time": 0.9, ...}
+    '''
+    def bucket(length):
+        lower = 1
+        for upper in BENCH_BUCKETS:
+            if length <= upper: return '{}-{}'.format(lower, upper)
+            lower = upper+1
+        return '>{}'.format(BENCH_BUCKETS[-1])
+    groups = {}
+    for row in sorted(rows, key=lambda row: row['length']):
+        groups.setdefault((bucket(row['length']), row['energy'], row['backend']), []).append(row)
+
+    summary = []
+    for (lengths, energy, backend), group in groups.items():
+        solved = [row for row in group if row['status'] == 'optimal']
+        median = lambda field: (percentile([row[field] for row in solved], 50)
+                                if solved and solved[0][field] is not None else None)
+        rss = [row['peak_rss_mb'] for row in group if row['peak_rss_mb'] is not None]
+        summary.append({'lengths': lengths, 'energy': energy, 'backend': backend, 'runs': len(group), 'solved': len(solved),
+                        'wall_time': median('wall_time'), 'ground_time': median('ground_time'), 'solve_time': median('solve_time'),
+                        'first_model_time': median('first_model_time'), 'peak_rss_mb': max(rss) if rss else None})
+    return summary
+
+def diagnose(argv):
+    '''
+    Diagnose command: grounds a sequence with the selected encoding and energy function and
+    prints the ground rules and atoms of each labelled rule of the programs (ground_sizes),
+    with the totals of the statistics of clingo (--stats) of the ground program.
+
+    Example: python rna_prediction.py diagnose ACGAAAUCGAAACGCCCAUUUUGU 1 --encoding nested
+    '''
+    parser = argparse.ArgumentParser(prog='rna_prediction.py diagnose',
+                                     description='Size of the ground program of a RNA sequence attributed to each labelled rule of the encodings.')
+    parser.add_argument('sequence', type=str,
+                         help='RNA sequence [example: ACCGUA]')
+    parser.add_argument('energy', type=int,
+                        help='energy function used [possible values 1, 2 and 0]')
+    parser.add_argument('--output', type=str, default=None,
+                        help='also write the sizes in a JSON file')
+    add_options(parser)
+
+    args = parser.parse_args(argv)
+    if len(args.sequence) == 0 or any(x not in BASES for x in args.sequence):
+        print('Invalid sequence. Sequence can only have the bases A,C,G,U.')
+        sys.exit()
+    if args.energy not in [0,1,2]:
+        print('Invalid energy function. Energy must be 0, 1 or 2.')
+        sys.exit()
+    if clingo is None:
+        print('Clingo python module not found. The diagnose command needs it to observe the ground program.')
+        sys.exit()
+    # the program part of multi-shot solving is not grounded as the base part, so the program is always single-shot
+    if args.multishot: print('The diagnose command grounds the program of one sequence. Ignoring --multishot.')
+    predictor = Predictor(verbose=False, **dict(read_options(args), multishot=False))
+
+    print('GROUNDING {} ({} BASES) WITH E{} AND THE {} ENCODING...'.format(args.sequence, len(args.sequence),
+          energy_name(args.energy), args.encoding.upper()))
+    sizes = ground_sizes(predictor, args.sequence, args.energy)
+
+    print('='*CONSOLE_LINE_LENGTH_)
+    print("{:<12} {:<12} {:<8} {:<12} {:<8}".format('RULE', 'GROUND RULES', '%', 'ATOMS', '%'))
+    for label, size in sizes['rules'].items():
+        print("{:<12} {:<12} {:<8.1f} {:<12} {:<8.1f}".format(label, size['rules'], 100*size['rules']/max(sizes['ground_rules'], 1),
+              size['atoms'], 100*size['atoms']/max(sizes['ground_atoms'], 1)))
+    print("{:<12} {:<12} {:<8} {:<12} {:<8}".format('TOTAL', sizes['ground_rules'], '', sizes['ground_atoms'], ''))
+    print('='*CONSOLE_LINE_LENGTH_)
+    print('CLINGO STATISTICS (--stats)')
+    for name, value in sizes['stats'].items(): print("{:<40} {:<40}".format(name.upper().replace('_', ' ')+':', value))
+    print('GROUNDING TIME: {:.3f}s'.format(sizes['time']))
+    print('='*CONSOLE_LINE_LENGTH_)
+
+    if args.output is not None:
+        with atomic_output(args.output) as output_file:
+            json.dump(dict(sizes, sequence=args.sequence, energy=args.energy, encoding=args.encoding), output_file, indent=1)
+            output_file.write('\n')
+        print('Output File: {}'.format(args.output))
+
+def ground_sizes(predictor, sequence, energy):
+    '''
+    Grounds sequence with the base encoding and energy function of predictor and attributes the
+    ground program to the labelled rules (RULE_LABEL) with the marker rules of labelled_program:
+    the ground rules of a rule are its ground instances (the different atoms __rule(label, variables))
+    and its ground atoms the different atoms of their heads (__head(label, atom)). The marker
+    rules have the bodies of the rules, so the grounding of the rules is not changed. The rules
+    without label are 'other'.
+    The totals are the statistics of clingo of the ground program without the marker rules.
+    Returns the sizes: {'rules': {label: {'rules': ground rules, 'atoms': ground atoms}}, 'ground_rules': total,
+    'ground_atoms': total, 'stats': clingo statistics, 'time': grounding time without the marker rules}.
+    '''
+    solver = predictor.clingo_solver(energy)
+    facts = predictor.input_facts(sequence)
+
+    # statistics of the program: only one model is searched to get the statistics of the ground program
+    control = clingo.Control(solver.arguments + ['--stats', '--models=1', '--opt-mode=ignore'])
+    control.add('base', [], solver.program)
+    control.add('base', [], facts)
+    start = time.perf_counter()
+    control.ground([('base', [])])
+    ground_time = time.perf_counter() - start
+    control.solve()
+    lp, generator = control.statistics['problem']['lp'], control.statistics['problem']['generator']
+    stats = {'rules': lp['rules'], 'rules_choice': lp['rules_choice'], 'rules_minimize': lp['rules_minimize'],
+             'rules_translated': lp['rules_tr'], 'atoms': lp['atoms'], 'bodies': lp['bodies'], 'equivalences': lp['eqs'],
+             'variables': generator['vars'], 'constraints': generator['constraints']}
+    stats = {name: int(value) for name, value in stats.items()}
+
+    # program with the marker rules
+    program, labels = labelled_program(solver.program)
+    control = clingo.Control(solver.arguments)
+    control.add('base', [], program)
+    control.add('base', [], facts)
+    control.ground([('base', [])])
+    rules = {label: {'rules': 0, 'atoms': 0} for label in labels + ['other']}
+    for name, size in [('__rule', 'rules'), ('__head', 'atoms')]:
+        for atom in control.symbolic_atoms.by_signature(name, 2):
+            rules[atom.symbol.arguments[0].string][size] += 1
+
+    return {'rules': rules, 'ground_rules': sum(size['rules'] for size in rules.values()),
+            'ground_atoms': sum(size['atoms'] for size in rules.values()), 'stats': stats, 'time': round(ground_time, 4)}
+
+def labelled_program(program):
+    '''
+    Returns program with the marker rules of its rules and optimization statements, and the
+    labels of the rules in order of appearance. The label of a rule is the one of the comment
+    in its lines (RULE_LABEL), 'other' without label. A rule 'head :- body' gets the marker
+    rules '__rule(label, (global variables)) :- body' (one atom per ground instance) and
+    '__head(label, atom) :- body, condition' for every atom of its head.
+
+    Example: 'a(X) :- b(X,Y).   %R3' -> 'a(X) :- b(X,Y). __rule("R3",(X,Y)) :- b(X,Y). __head("R3",a(X)) :- b(X,Y).', ['R3']
+    '''
+    lines = program.split('\n')
+    labels = []
+    statements = []
+
+    class VariableCollector(clingo.ast.Transformer):
+        def __init__(self):
+            self.variables = []
+        def visit_Variable(self, variable):
+            if variable.name != '_' and variable.name not in self.variables: self.variables.append(variable.name)
+            return variable
+    def variables(*nodes):
+        collector = VariableCollector()
+        for node in nodes: collector(node)
+        return collector.variables
+
+    def add(statement):
+        ast_type = statement.ast_type
+        if ast_type == clingo.ast.ASTType.Program: return
+        statements.append(str(statement))
+        if ast_type not in [clingo.ast.ASTType.Rule, clingo.ast.ASTType.Minimize]: return
+        location = statement.location
+        label = 'other'
+        for line in lines[location.begin.line-1:location.end.line]:
+            match = RULE_LABEL.search(line)
+            if match is not None:
+                label = match.group(1)
+                if label not in labels: labels.append(label)
+                break
+
+        # the variables of the conditions of the aggregates and conditional literals are local
+        body = [str(literal) for literal in statement.body]
+        global_variables = []
+        for literal in statement.body:
+            if literal.ast_type != clingo.ast.ASTType.Literal: continue
+            atom = literal.atom
+            if atom.ast_type in [clingo.ast.ASTType.BodyAggregate, clingo.ast.ASTType.Aggregate]:
+                guards = [guard.term for guard in [atom.left_guard, atom.right_guard] if guard is not None]
+                global_variables += variables(*guards)
+            else: global_variables += variables(literal)
+        if ast_type == clingo.ast.ASTType.Minimize: global_variables += variables(statement.weight, statement.priority, *statement.terms)
+        global_variables = list(dict.fromkeys(global_variables))
+        marker = lambda head, condition=[]: '{} :- {}.'.format(head, '; '.join(body + condition)) if body + condition else head + '.'
+        statements.append(marker('__rule("{}",({}{}))'.format(label, ','.join(global_variables), ',' if len(global_variables) == 1 else '')))
+
+        if ast_type == clingo.ast.ASTType.Minimize: return
+        head = statement.head
+        if head.ast_type == clingo.ast.ASTType.Literal:
+            elements = [(head, [])] if head.atom.ast_type == clingo.ast.ASTType.SymbolicAtom else []
+        elif head.ast_type == clingo.ast.ASTType.HeadAggregate:
+            elements = [(element.condition.literal, list(element.condition.condition)) for element in head.elements]
+        else:       # choice rules and disjunctions
+            elements = [(element.literal, list(element.condition)) for element in head.elements]
+        for literal, condition in elements:
+            if literal.atom.ast_type != clingo.ast.ASTType.SymbolicAtom: continue
+            statements.append(marker('__head("{}",{})'.format(label, literal.atom.symbol), [str(c) for c in condition]))
+    clingo.ast.parse_string(program, add)
+    return '\n'.join(statements), labels
+
+def metrics_record(predictor, prediction):
+    '''
+    Returns the metrics record of a prediction of predictor: the options that change its
+    time, the timings of its stages (STAGES) and the times of clingo (grounding is the total
+    time but the solving time).
+
+    Example: {"time": "2024-05-01T10:00:00", "sequence": "ACCUGGUAUCGACA", "length": 14, "energy": 2, "backend": "clingo",
+              "engine": "api", "encoding": "half", "cached": false, "optimal": true,
+              "stages": {"input": 0.0002, "solve": 0.0301, "parse": 0.0001, ...}, "clingo": {"ground": 0.02, "solve": 0.01, ...}}
+    '''
+    record = {'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'sequence': prediction.sequence, 'length': len(prediction.sequence),
+              'energy': prediction.energy, 'backend': predictor.backend,
+              'engine': predictor.engine if predictor.backend == 'clingo' else None,
+              'encoding': predictor.encoding if predictor.backend == 'clingo' else None,
+              'cached': prediction.cached, 'optimal': prediction.optimal,
+              'stages': {name: round(prediction.timings[name], 6) for name in STAGES if name in prediction.timings}, 'clingo': None}
+    if prediction.clingo is not None and not prediction.cached:
+        result = prediction.clingo
+        record['clingo'] = {'ground': round(result.time - result.solve_time, 6), 'solve': round(result.solve_time, 6),
+                            'first_model': round(result.first_model_time, 6), 'unsat': round(result.unsat_time, 6),
+                            'total': round(result.time, 6), 'cpu': round(result.cpu_time, 6), 'models': result.models}
+    return record
+
+def write_metrics(path, record):
+    '''
+    Appends the metrics record (metrics_record) to the JSON lines file path. Each record is
+    written with a single write, so the records of concurrent runs are not mixed.
+    '''
+    if os.path.dirname(path): os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as metrics_file:
+        metrics_file.write(json.dumps(record) + '\n')
+
+def input_facts(sequence, min_loop=1, max_span=None, c1_grid=C1_GRID, sequence_id=None):
+    '''
+    Returns the clingo facts of the input file parsing a raw sequence: seq facts of the
+    sequence, canpair facts of its candidate pairings and c1_grid facts of the values of c1.
+    If sequence_id is given, it is added as first argument of every fact (see ClingoSolver).
+
+    Example: ACCG -> seq(1,a). seq(2,c). seq(3,c). seq(4,g). ...
+             ACCG, sequence_id='k' -> seq(k,1,a). seq(k,2,c). ...
+    '''
+    first = '' if sequence_id is None else '{},'.format(sequence_id)
     # File content instantation.
     content = ''
-
-    print('PARSING SEQUENCE INTO CLINGO LP INPUT FILE...')
-    for i,b in enumerate(SEQUENCE, start=1):
+    for i,b in enumerate(sequence, start=1):
         new_line = '\n' if i % 6 == 0 else ''                       # line jump each 6 facts for better view
-        content += 'seq({},{}). {}'.format(i,b.lower(),new_line)    # parsing
-    # Write to file
-    f = open(CLINGO_INPUT_FILE, 'w')
-    f.write(content)
-    f.close()
-    print('Input File: ',CLINGO_INPUT_FILE,'\n')
-
-def run_clingo():
-    '''
-    Run clingo program 'rna_ss_prediction_E{energy function value}.lp'. 
-    The output is saved in the clingo output directory and showed in console.
-    '''
-    global CLINGO_OUTPUT_FILE
-    # Output file name has the sequence at the end of the name 
-    CLINGO_OUTPUT_FILE = ENERGY_FILE.split('.')[0]+'_{}.txt'.format(SEQUENCE)
-    out_file = os.path.join(CLINGO_OUTPUT_DIR,CLINGO_OUTPUT_FILE)
-    
-    # Clingo program file path
-    lp_file = os.path.join(CLINGO_DIR,ENERGY_FILE)
-    
-    # Run clingo program
-    cmd = '{} {}'.format(CLINGO_EXE,lp_file,out_file)
-    print('EXECUTING: ',cmd)
-    print('RUNNING CLINGO...')
-    clingo_output = subprocess.getoutput(cmd)
-    
-    # write output to file
-    with open(out_file, "w") as clingo_output_file:
-        clingo_output_file.write(clingo_output)
-    clingo_output_file.close()
-    
-    # print output
-    print('='*CONSOLE_LINE_LENGTH_)
-    print(clingo_output,'\n')
-    print('CLINGO EXECUTION DONE...\n')
+        content += 'seq({}{},{}). {}'.format(first,i,b.lower(),new_line)    # parsing
+    content += '\n'
+    for k,(i,j) in enumerate(candidate_pairings(sequence,min_loop,max_span), start=1):
+        new_line = '\n' if k % 6 == 0 else ''
+        content += 'canpair({}{},{}). {}'.format(first,i,j,new_line)
+    content += '\nc1_grid({}).\n'.format(';'.join(first+str(c1) for c1 in c1_grid))   # c1 values of energy 2
+    return content
+
+def parse_c1_grid(text):
+    '''
+    Parses the console parameter '--c1-grid': values or inclusive ranges START:END
+    separated by commas. Raises ValueError if any of them is not an integer.
+
+    Example: '40,50,60:62' -> [40, 50, 60, 61, 62]
+    '''
+    grid = set()
+    for item in text.split(','):
+        if ':' in item:
+            start, end = item.split(':')
+            grid.update(range(int(start), int(end)+1))
+        else: grid.add(int(item))
+    return sorted(grid)
+
+def candidate_pairings(sequence, min_loop=1, max_span=None):
+    '''
+    Computes the pairs of sequence indexes (i,j), i<j, whose bases can be paired
+    enclosing at least min_loop bases and, if max_span is given, with j-i not 
+    greater than max_span.
+
+    Example: ACCGU -> [(1,5), (2,4)] 
+    '''
+    len_seq = len(sequence)
+    candidates = []
+    for i in range(1, len_seq+1):
+        last = len_seq if max_span is None else min(len_seq, i+max_span)
+        for j in range(i+min_loop+1, last+1):
+            if sequence[i-1]+sequence[j-1] in PAIRINGS: candidates.append((i,j))
+    return candidates
+
+@contextlib.contextmanager
+def atomic_path(path):
+    '''
+    Temporary path in the directory of path (with its extension) that is renamed as path when
+    the block ends without errors (atomic rename), so concurrent predictions never write or
+    read a partial file. It is removed otherwise.
+    '''
+    directory, name = os.path.split(path)
+    descriptor, temp_path = tempfile.mkstemp(prefix='.'+name+'.', suffix=os.path.splitext(name)[1], dir=directory or '.')
+    os.close(descriptor)
+    try:
+        yield temp_path
+        if os.path.exists(temp_path): os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path): os.remove(temp_path)
+
+@contextlib.contextmanager
+def atomic_output(path):
+    '''
+    Text file opened for writing that replaces path when it is complete (atomic_path).
+    '''
+    with atomic_path(path) as temp_path, open(temp_path, 'w') as output_file:
+        yield output_file
+
+@dataclass
+class ClingoResult:
+    '''
+    Result of a clingo execution of both engines: the last model found (the optimum, if
+    clingo finished the search) and the summary of the execution.
+    '''
+    symbols: List[str] = field(default_factory=list)    # shown atoms of the last model
+    costs: List[int] = field(default_factory=list)      # optimization value of the last model
+    result: str = 'UNKNOWN'                             # one of CLINGO_RESULTS
+    optimal: bool = False                               # the last model is an optimum
+    lower_bound: List[int] = field(default_factory=list) # lower bound of the optimization proved by clingo (if any)
+    time_limit: bool = False                            # stopped by the time limit
+    models: int = 0                                     # number of models found
+    time: float = 0.0                                   # total time (seconds)
+    cpu_time: float = 0.0                               # CPU time (seconds)
+    solve_time: float = 0.0                             # solving time, the rest is grounding (seconds)
+    first_model_time: float = 0.0                       # time to the first model (seconds)
+    unsat_time: float = 0.0                             # time of the last unsatisfiable call, the proof of the optimum (seconds)
+
+def read_clingo_json(lines, on_model=None, partial=False):
+    '''
+    Streaming parser of the JSON output of clingo (--outf=2) given as an iterable of lines.
+    The brackets of each line are tokenized (JSON_BRACKET, skipping the strings) to follow
+    the nesting of the document. The lines of each witness (model) of the 'Witnesses' arrays
+    are kept until the witness is closed and only the last one is parsed, unless every model
+    is needed by on_model(number, symbols, costs). The rest of the document (without the
+    witnesses) is parsed at the end. Raises ValueError if the document is incomplete or has no
+    'Result', unless partial (clingo interrupted), where the models read are returned.
+    Returns the result of the execution (ClingoResult).
+
+    Example: {"Call": [{"Witnesses": [{"Value": ["contacts(0)"], "Costs": [0]}]}], 
+              "Result": "OPTIMUM FOUND", "Models": {"Number": 1, "Optimum": "yes"}, ...}
+          -> ClingoResult(symbols=['contacts(0)'], costs=[0], result='OPTIMUM FOUND', optimal=True, models=1, ...)
+    '''
+    result = ClingoResult()
+    def add_model(witness):
+        result.models += 1
+        result.symbols = witness['Value']
+        result.costs = witness.get('Costs', [])
+        if on_model is not None: on_model(result.models, result.symbols, result.costs)
+
+    document = []       # lines of the document out of the witnesses
+    witness = []        # lines of the current witness
+    last = None         # text of the last model (parsed at the end)
+    models = 0          # number of models read
+    depth = 0           # number of open objects and arrays
+    witnesses = None    # depth of the elements of the open 'Witnesses' array
+    key = None          # last string read (only in the lines of the 'Witnesses' key)
+    for line in lines:
+        in_witness = witnesses is not None and (depth > witnesses or (depth == witnesses and line.lstrip().startswith('{')))
+        # the values of the models have no brackets (unless they have string terms)
+        if '"Witnesses"' in line: tokens = JSON_TOKEN.findall(line)
+        elif '[' in line or ']' in line or '{' in line or '}' in line: tokens = JSON_BRACKET.findall(line)
+        else: tokens = ()
+        for token in tokens:
+            if token == '{' or token == '[':
+                depth += 1
+                if token == '[' and key == '"Witnesses"' and witnesses is None: witnesses = depth
+                key = None
+            elif token == '}' or token == ']':
+                depth -= 1
+                if witnesses is not None and depth < witnesses: witnesses = None
+            elif token: key = token
+        if not in_witness:
+            document.append(line)
+            continue
+        witness.append(line)
+        if depth == witnesses:
+            text = ''.join(witness).strip().rstrip(',')
+            witness = []
+            # the witnesses without value are lower bounds of the optimization (several threads)
+            if '"Value"' not in text: continue
+            if on_model is not None: add_model(json.loads(text))
+            else: last, models = text, models + 1
+    if last is not None:
+        result.models = models - 1
+        add_model(json.loads(last))
+
+    try: summary = json.loads(''.join(document))
+    except ValueError:
+        if partial: return result           # incomplete output (clingo interrupted)
+        raise ValueError('Incomplete clingo output.')
+    if 'Result' not in summary:
+        if partial: return result
+        raise ValueError('Clingo output without result.')
+    # witnesses not separated in lines
+    for call in summary.get('Call', []):
+        for witness in call.get('Witnesses', []):
+            if 'Value' in witness: add_model(witness)
+    result.result = summary.get('Result', result.result)
+    result.models = summary.get('Models', {}).get('Number', result.models)
+    result.optimal = summary.get('Models', {}).get('Optimum') == 'yes'
+    result.lower_bound = summary.get('Bounds', {}).get('Lower', [])
+    result.time_limit = summary.get('TIME LIMIT', 0) == 1
+    result.time = summary.get('Time', {}).get('Total', 0.0)
+    result.cpu_time = summary.get('Time', {}).get('CPU', 0.0)
+    result.solve_time = summary.get('Time', {}).get('Solve', 0.0)
+    result.first_model_time = summary.get('Time', {}).get('Model', 0.0)
+    result.unsat_time = summary.get('Time', {}).get('Unsat', 0.0)
+    return result
+
+def print_model(number, symbols, costs, output=print):
+    '''
+    Prints a model like the text output of clingo (or passes its lines to output).
+    '''
+    output('Answer: {}'.format(number))
+    output(' '.join(symbols))
+    if costs: output('Optimization: {}'.format(' '.join(str(c) for c in costs)))
+
+def print_result(result, output=print):
+    '''
+    Prints the summary of a clingo execution (ClingoResult) like the text output of clingo
+    (or passes its lines to output).
+    '''
+    output(result.result)
+    output('')
+    output('Models       : {}'.format(result.models))
+    if result.costs: 
+        output('  Optimum    : {}'.format('yes' if result.optimal else 'unknown'))
+        output('Optimization : {}'.format(' '.join(str(c) for c in result.costs)))
+    if result.lower_bound and not result.optimal:
+        output('Bounds       : [{};{}]'.format(' '.join(str(c) for c in result.lower_bound), ' '.join(str(c) for c in result.costs)))
+    if result.time_limit: output('TIME LIMIT   : 1')
+    output('Time         : {:.3f}s (Solving: {:.2f}s 1st Model: {:.2f}s Unsat: {:.2f}s)'.format(
+           result.time, result.solve_time, result.first_model_time, result.unsat_time))
+    output('CPU Time     : {:.3f}s'.format(result.cpu_time))
+
+def clingo_program(file_name):
+    '''
+    Returns the content of the clingo program file_name of CLINGO_DIR without the include
+    of the input file, whose facts are added directly by the api engine or written after it
+    in the standard input of clingo by the binary engine. Each file is only read once (PROGRAMS).
+    '''
+    if file_name not in PROGRAMS:
+        with open(os.path.join(CLINGO_DIR,file_name),'r',encoding='utf-8') as lp_file:
+            PROGRAMS[file_name] = re.sub(r'#include\s*"input/rna_ss_input.lp"\s*\.', '', lp_file.read())
+    return PROGRAMS[file_name]
 
+def clingo_version(clingo_exe):
+    '''
+    Returns the version of the clingo executable (first line of 'clingo --version'). Each
+    executable is only asked once (CLINGO_VERSIONS).
+
+    Example: 'clingo version 5.4.0'
+    '''
+    if clingo_exe not in CLINGO_VERSIONS:
+        output = subprocess.run('{} --version'.format(clingo_exe), shell=True, stdout=subprocess.PIPE, universal_newlines=True).stdout
+        CLINGO_VERSIONS[clingo_exe] = output.split('\n')[0].strip()
+    return CLINGO_VERSIONS[clingo_exe]
 
-def read_clingo_output():
+class ClingoSolver:
     '''
-    Extract the pairing predicates from the clingo output file and construct the connection string
-    needed by VARNA. This string has the length of the RNA sequence and a link is represented by 
-    parenthesis '(' for the first appearing base and ')' for the other one. Non paired bases are 
-    represented by dots '.'.
+    Long-lived in process clingo solver of a base encoding and an energy file for several
+    sequences. The programs are read and prepared once.
+
+    By default each sequence is grounded and solved in a new clingo control, since creating
+    it and parsing the programs takes less than a millisecond with the python module.
+
+    With multishot, the sequences are solved in the same clingo control (multi-shot solving,
+    like the controller example of the clingo distribution 'examples/clingo/controller-threads').
+    The programs are transformed once into the program part '#program rna(k)', adding the
+    number k of the sequence as first argument of every atom. The facts of each sequence k
+    are grounded with rna(k) and solved with the external atom active(k) true. It guards the
+    choice rules, the constraints and the optimization statements, so releasing it after
+    solving disables the rules of the sequence. The transformed program is kept, but the clingo
+    control is created again every max_sequences sequences (adding and parsing the program
+    again), since the ground program grows with each rna(k) part: the atoms and rules of the
+    released sequences are kept in the control and slow down the next solve calls. The control
+    is shared, so the multi-shot solve calls of several threads run one at a time.
+    '''
+
+    def __init__(self, encoding_file, energy_file, min_loop=1, max_span=None, multishot=False, max_sequences=5, options=[]):
+        self.arguments = ['-c','min_loop={}'.format(min_loop), '-c','max_span={}'.format(max_span or 0)] + list(options)
+        self.multishot = multishot
+        self.max_sequences = max_sequences
+        self.program = clingo_program(encoding_file) + '\n' + clingo_program(energy_file)
+        if multishot: self.program = self.sequence_program('rna', self.program)
+        self.control = None
+        self.sequences = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def sequence_program(part, program):
+        '''
+        Returns program as the program part '#program part(k).', adding the sequence number k
+        as first argument of every atom and the external atom active(k) to the body of the
+        choice rules, constraints and optimization statements.
+        '''
+        location = clingo.ast.Location(clingo.ast.Position('<rna>',1,1), clingo.ast.Position('<rna>',1,1))
+        k = clingo.ast.Function(location, 'k', [], False)
+        active = clingo.ast.Literal(location, clingo.ast.Sign.NoSign,
+                                    clingo.ast.SymbolicAtom(clingo.ast.Function(location, 'active', [k], False)))
+
+        def add_sequence(term):
+            if term.ast_type == clingo.ast.ASTType.Pool:
+                return term.update(arguments=[add_sequence(t) for t in term.arguments])
+            return term.update(arguments=[k] + list(term.arguments))
+
+        class SequenceTransformer(clingo.ast.Transformer):
+            def visit_SymbolicAtom(self, atom):
+                return atom.update(symbol=add_sequence(atom.symbol))
+
+        transformer = SequenceTransformer()
+        statements = ['#program {}(k).'.format(part), '#external active(k).']
+        def add(statement):
+            ast_type = statement.ast_type
+            if ast_type == clingo.ast.ASTType.Program: return
+            if ast_type in [clingo.ast.ASTType.ShowSignature, clingo.ast.ASTType.Defined]:
+                statements.append(str(statement.update(arity=statement.arity+1)))
+                return
+            statement = transformer(statement)
+            if ast_type == clingo.ast.ASTType.ShowTerm: statement = statement.update(term=add_sequence(statement.term))
+            choice = ast_type == clingo.ast.ASTType.Rule and statement.head.ast_type == clingo.ast.ASTType.Aggregate
+            constraint = (ast_type == clingo.ast.ASTType.Rule and statement.head.ast_type == clingo.ast.ASTType.Literal
+                          and statement.head.atom.ast_type == clingo.ast.ASTType.BooleanConstant)
+            if choice or constraint or ast_type == clingo.ast.ASTType.Minimize:
+                statement = statement.update(body=list(statement.body) + [active])
+            statements.append(str(statement))
+        clingo.ast.parse_string(program, add)
+        return '\n'.join(statements)
+
+    def solve(self, facts, on_model=None, time_limit=None):
+        '''
+        Solves the sequence whose input facts are returned by facts(sequence_id) (input_facts).
+        on_model(number, symbols, costs) is called for every model found with its shown atoms
+        as strings. With time_limit (seconds, including the grounding), the search is stopped when
+        it is reached and the last model found is kept. Returns the result of the execution (ClingoResult).
+        '''
+        start = time.perf_counter(), time.process_time()
+        remaining = lambda: None if time_limit is None else max(0, time_limit - (time.perf_counter() - start[0]))
+        if not self.multishot:
+            control = clingo.Control(self.arguments)
+            control.add('base', [], self.program)
+            control.add('base', [], facts())
+            control.ground([('base', [])])
+            result = ClingoResult()
+            def model_symbols(model):
+                self.add_model(result, model, model.symbols(shown=True), on_model)
+            return self.summary(result, start, self.solve_control(control, model_symbols, remaining(), result), control)
 
-    Example: 'ACCGA' with pairing(2,4) is represented by '.(.).'
+        with self.lock:
+            if self.control is None or self.sequences == self.max_sequences:
+                self.control = clingo.Control(self.arguments)
+                self.control.add('base', [], self.program)
+                self.sequences = 0
+            self.sequences += 1
+            k = clingo.Number(self.sequences)
+            part = 'input_{}'.format(self.sequences)
+
+            self.control.add(part, ['k'], facts('k'))
+            self.control.ground([(part, [k]), ('rna', [k])])
+            active = clingo.Function('active', [k])
+            self.control.assign_external(active, True)
+
+            # the atoms of the previous sequences are kept, only the ones of k are shown
+            result = ClingoResult()
+            def model_symbols(model):
+                symbols = [clingo.Function(symbol.name, symbol.arguments[1:]) for symbol in model.symbols(shown=True)
+                           if symbol.arguments and symbol.arguments[0] == k]
+                self.add_model(result, model, symbols, on_model)
+            solve_result = self.solve_control(self.control, model_symbols, remaining(), result)
+            # the statistics are reset when the control is changed
+            self.summary(result, start, solve_result, self.control)
+            self.control.release_external(active)
+            return result
+
+    @staticmethod
+    def solve_control(control, on_model, time_limit, result):
+        '''
+        Solves the grounded program of control, stopping the search after time_limit seconds
+        (if given) like the option --time-limit of the clingo executable (result.time_limit).
+        Returns the clingo solve result.
+        '''
+        if time_limit is None: return control.solve(on_model=on_model)
+        with control.solve(on_model=on_model, async_=True) as handle:
+            if not handle.wait(time_limit):
+                handle.cancel()
+                result.time_limit = True
+            return handle.get()
+
+    @staticmethod
+    def add_model(result, model, symbols, on_model=None):
+        '''
+        Keeps the model in result (ClingoResult) as its last model.
+        '''
+        result.models += 1
+        result.symbols = [str(symbol) for symbol in sorted(symbols)]
+        result.costs = list(model.cost)
+        if on_model is not None: on_model(result.models, result.symbols, result.costs)
+
+    @staticmethod
+    def summary(result, start, solve_result, control):
+        '''
+        Completes result (ClingoResult) with the clingo solve result, the lower bound and the
+        solving times of the statistics of control and the time since start (wall and CPU time).
+        '''
+        if solve_result.unsatisfiable: result.result = 'UNSATISFIABLE'
+        elif solve_result.satisfiable: result.result = 'OPTIMUM FOUND' if solve_result.exhausted and result.costs else 'SATISFIABLE'
+        result.optimal = result.result == 'OPTIMUM FOUND'
+        lower_bound = control.statistics['summary'].get('lower', [])
+        # the lower bound is only known by some strategies (-inf or nan otherwise)
+        if all(math.isfinite(bound) for bound in lower_bound): result.lower_bound = [int(bound) for bound in lower_bound]
+        times = control.statistics['summary']['times']
+        result.solve_time, result.first_model_time, result.unsat_time = times['solve'], times['sat'], times['unsat']
+        result.time = time.perf_counter() - start[0]
+        result.cpu_time = time.process_time() - start[1]
+        return result
+
+def read_clingo_output(result):
     '''
-    global C1
+    Extract the pairing predicates and the best c1 of energy 2 (None for the other energies) from 
+    the last model of the clingo result (ClingoResult of run_clingo or run_clingo_api).
+    Returns the pairing dictionary and c1.
 
-    # read Clingo output file
-    with open(os.path.join(CLINGO_OUTPUT_DIR,CLINGO_OUTPUT_FILE),'r',encoding='utf-8') as clingo_out:
-        content = clingo_out.read()
-        # Get the number of models before optimum
-        models = re.findall(r'(?<=Models       : )(.*)',content)
-        # Extract the output between 'Answer: {models}' and 'OPTIMUM FOUND' (optimum model output)
-        response = re.findall(r'(?<=Answer: {}\n)[\S\s]*(?=OPTIMUM FOUND)'.format(models[0]), content)
-        # Extract pairing predicates from optimum model output
-        pairings = re.findall(r'pairing\(\d+,\d+\)',response[0])
-        # Extract best c1 param for e2
-        c1_predicate = re.findall(r'c1\(\d+\)',response[0])
-        C1 = int(re.findall(r'\d+',c1_predicate[0])[1]) if len(c1_predicate) != 0 else None
-    clingo_out.close()
+    Example: pairing(2,4) pairing(4,2) c1(40) -> {2: 4}, 40
+    '''
+    c1 = None
 
-    # dictionary of the pairings (only once per pairing)
+    # dictionary of the pairings (only once per pairing). The half encoding and the compact output only 
+    # show pairing(n1,n2) with n1 < n2, the others also show the symmetric pairing(n2,n1)
     pairing_dict = {}
-    for p in pairings:
-        indexes = re.findall(r'\d+',p) # Extract sequence indexes frfom pairing predicate
-        n1 = int(indexes[0])
-        n2 = int(indexes[1])
-        if n1 < n2: pairing_dict[n1] = n2 # Add to dictionary 
+    for symbol in result.symbols:
+        atom = re.fullmatch(r'(\w+)\(([\d,]*)\)', symbol)
+        if atom is None: continue
+        name, arguments = atom.group(1), [int(argument) for argument in atom.group(2).split(',')]
+        if name == 'pairing' and arguments[0] < arguments[1]: pairing_dict[arguments[0]] = arguments[1]
+        # best c1 param for e2
+        elif name == 'c1': c1 = arguments[0]
+    pairing_dict = dict(sorted(pairing_dict.items()))
     
+    return pairing_dict, c1
+
+def connection_string(sequence, pairing_dict):
+    '''
+    Construct the connection string needed by VARNA. This string has the length of the RNA sequence 
+    and a link is represented by parenthesis '(' for the first appearing base and ')' for the other one. 
+    Non paired bases are represented by dots '.'.
+
+    Example: 'ACCGA' with {2: 4} is represented by '.(.).'
+    '''
     # Instance of the connection using dots
-    connections = list('.'*len(SEQUENCE))
+    connections = list('.'*len(sequence))
     # Substitution in connection list
     for k,v in pairing_dict.items():
         connections[k-1] = '('
         connections[v-1] = ')'
     
     # connection to string
-    connections = ''.join(connections)
+    return ''.join(connections)
 
-    return pairing_dict, connections
+def pairing_counts(sequence, pairing_dict):
+    '''
+    Returns the number of AU and CG pairings of the pairing dictionary of sequence.
+    '''
+    pairings = [sequence[k-1]+sequence[v-1] for k,v in pairing_dict.items()]
+    au = sum(1 for p in pairings if p in ['AU','UA'])
+    cg = sum(1 for p in pairings if p in ['CG','GC'])
+    return au, cg
 
-def statistics(pairing_dictionary,connections):
+def pairing_stats(sequence, pairing_dictionary):
     """
-    Generates information about the sequence and the predicted
-    secondary structure into a file and prints it.
+    Returns the numbers and proportions of the pairings of each type of the 
+    predicted secondary structure of sequence (statistics and batch).
     """
-    sequence_dict = dict(enumerate(SEQUENCE, start=1))
-    len_seq = len(SEQUENCE)                 # sequence length
+    sequence_dict = dict(enumerate(sequence, start=1))
+    len_seq = len(sequence)                 # sequence length
     pairings = len(pairing_dictionary)      # number of pairings
     paired_bases = pairings * 2             # number of paired bases
     cg_pairings = 0                         # number of CG pairings
@@ -245,71 +2168,26 @@ def statistics(pairing_dictionary,connections):
         au_prop = au_pairings / pairings
         gu_prop = gu_pairings / pairings
 
-    stats = {
-        'SEQUENCE LENGTH:':[len_seq,'-'],
-        'NUM. PAIRINGS:':[pairings,'-'],
-        'NUM. PAIRED BASES:':[paired_bases,'-'],
-        'NUM. CG PAIRINGS:':[cg_pairings,'-'],
-        'NUM. AU PAIRINGS:':[au_pairings,'-'],
-        'NUM. GU PAIRINGS:':[gu_pairings,'-'],
-        'PROP.  CG PAIRINGS:':[cg_prop, '0.53'],
-        'PROP.  AU PAIRINGS:':[au_prop, '0.35'],
-        'PROP.  GU PAIRINGS:':[gu_prop, '0.12'],
-
-    }
-    if C1 is not None: stats['BEST C1 FOUND:'] = [C1, '-']
-
-    # File content
-    content = 'STATS OF SEQUENCE: E{} - {}\n'.format(ENERGY_FUNC,SEQUENCE) 
-    content += '='*CONSOLE_LINE_LENGTH_+ '\n'
-
-    content += "{:<40} {:<40} \n".format('PAIRING DICTIONARY:', str(pairing_dictionary)) 
-    content += "{:<40} {:<40} \n".format('SEQUENCE STRING:', SEQUENCE) 
-    content += "{:<40} {:<40} \n".format('PARENTHESIS AND DOTS CONNECTION STRING:', connections) 
-    content += '='*CONSOLE_LINE_LENGTH_+ '\n'
-    content += "{:<20} {:<20} {:<20}\n".format('', 'PREDICTED', 'EXPECTED') 
-    for k, v in stats.items():
-        pred, expected = v
-        content += "{:<20} {:<20.2f} {:<20}\n".format(k, pred, expected)
-    print(content)
-    print('='*CONSOLE_LINE_LENGTH_,'\n')
-
-    # write to file
-    STATS_FILE = os.path.join(STATS_DIR, "STATS_{}_E{}.txt".format(SEQUENCE,ENERGY_FUNC))
-    with open(STATS_FILE, 'w') as stat_file:
-        stat_file.write(content)
-    stat_file.close()
+    return {'length': len_seq, 'pairings': pairings, 'paired_bases': paired_bases,
+            'cg_pairings': cg_pairings, 'au_pairings': au_pairings, 'gu_pairings': gu_pairings,
+            'cg_prop': cg_prop, 'au_prop': au_prop, 'gu_prop': gu_prop}
 
 def is_java_installed():
     '''
-    Check if Java is installed to avoid executing VARNA jar if not.
-    '''
-    version_check = subprocess.check_output(['java', '-version'], stderr=subprocess.STDOUT).decode("utf-8") 
-    pattern = '\"(\d+\.\d+).*\"'
-    version_search = re.search(pattern, version_check).groups()
-    if len(version_search) != 0:
-        version = version_search[0]
-        print('USING JAVA VERSION: ',version,'\n')
-        return True
-    else:
-        print('Java not found. Image will not be generated.')
-        return False
-        
-def generate_image(connections):
-    '''
-    Generate image from clingo output file using VARNA applet. 
+    Check if Java is installed to avoid executing VARNA jar if not. Java is only asked
+    once per process (JAVA_VERSION).
     '''
-
-    # image output name and path
-    image_name = SEQUENCE+'_'+str(ENERGY_FUNC)+'.png'
-    image_file = os.path.join(GENERATED_IMAGES_DIR,image_name)
-    image_title = "{}_E{}".format(SEQUENCE,ENERGY_FUNC)
-    print('RUNNING VARNA. GENERATING IMAGE...')
-    # VARNA command
-    base_cmd = 'java -cp {} fr.orsay.lri.varna.applications.VARNAcmd'.format(VARNA_JAR)
-    params = ' -sequenceDBN {} -structureDBN {} -title {} -o {}'.format(SEQUENCE,connections,image_title,image_file)
-    # VARNA applet run
-    os.system(base_cmd + params)
+    global JAVA_VERSION
+    if JAVA_VERSION is None:
+        try: version_check = subprocess.check_output(['java', '-version'], stderr=subprocess.STDOUT).decode("utf-8") 
+        except (OSError, subprocess.CalledProcessError): version_check = ''
+        pattern = r'"(\d+(?:\.\d+)?).*"'
+        version_search = re.search(pattern, version_check)
+        JAVA_VERSION = version_search.group(1) if version_search is not None else ''
+        if JAVA_VERSION: print('USING JAVA VERSION: ',JAVA_VERSION,'\n')
+        else: print('Java not found. Image will not be generated.')
+    return JAVA_VERSION != ''
+        
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()